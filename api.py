@@ -0,0 +1,228 @@
+import argparse
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from metrics import PROMETHEUS_CONTENT_TYPE, REGISTRY, timer
+from preprocessing import RAW_COLUMNS, RAW_NUMERICAL_COLUMNS
+from prediction_cache import PredictionCache
+from scoring import ENGINES, MODEL_VARIANTS, load_components, predict_batch, variant_dir
+
+DEFAULT_MAX_BATCH_SIZE = 64
+DEFAULT_MAX_WAIT_MS = 5.0
+DEFAULT_CACHE_SIZE = 10_000
+DEFAULT_CACHE_TTL = 3600.0
+
+
+class MicroBatcher:
+    """
+    Menggabungkan request yang datang bersamaan menjadi satu panggilan predict_proba:
+    - Request dimasukkan ke antrean dan menunggu Future miliknya
+    - Worker mengambil hingga max_batch_size baris atau menunggu max_wait_ms
+    """
+
+    def __init__(self, components, max_batch_size=DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms=DEFAULT_MAX_WAIT_MS, cache=None):
+        self.components = components
+        self.cache = cache
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, daemon=True)
+        self._worker.start()
+
+    def submit(self, rows):
+        """Mendaftarkan list baris input dan mengembalikan Future berisi list hasil"""
+        future = Future()
+        self._queue.put((rows, future))
+        return future
+
+    def _collect(self):
+        pending = [self._queue.get()]
+        n_rows = len(pending[0][0])
+        deadline = time.perf_counter() + self.max_wait
+        while n_rows < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            pending.append(item)
+            n_rows += len(item[0])
+        return pending
+
+    def _run(self):
+        while True:
+            pending = self._collect()
+            rows = [row for item_rows, _ in pending for row in item_rows]
+            try:
+                results = predict_rows(rows, self.components, self.cache)
+            except Exception as e:
+                for _, future in pending:
+                    future.set_exception(e)
+                continue
+            offset = 0
+            for item_rows, future in pending:
+                future.set_result(results[offset:offset + len(item_rows)])
+                offset += len(item_rows)
+
+
+def predict_rows(rows, components, cache=None):
+    """Memprediksi list dict input dalam satu panggilan predict_proba"""
+    model, _, label_encoder, _, _ = components
+    class_names = [str(c) for c in label_encoder.inverse_transform(model.classes_)]
+    return [result.to_dict(class_names) for result in predict_batch(rows, components, cache)]
+
+
+def validate_row(row):
+    """Memastikan satu baris input memiliki seluruh kolom prediktor"""
+    if not isinstance(row, dict):
+        raise ValueError("Setiap baris input harus berupa objek JSON")
+    missing = [col for col in RAW_COLUMNS if col not in row]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ditemukan: {', '.join(missing)}")
+    invalid = [
+        col for col in RAW_NUMERICAL_COLUMNS
+        if isinstance(row[col], bool) or not isinstance(row[col], (int, float))
+    ]
+    if invalid:
+        raise ValueError(f"Kolom harus berupa angka: {', '.join(invalid)}")
+    return row
+
+
+class PredictionHandler(BaseHTTPRequestHandler):
+    """
+    Endpoint JSON:
+    - GET  /health         : status service dan info model
+    - GET  /metrics        : histogram latency format Prometheus
+    - POST /predict        : satu objek input
+    - POST /predict/batch  : {"instances": [...]} atau list objek input
+    """
+
+    batcher = None
+    metadata = None
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"null")
+
+    def do_GET(self):
+        if self.path == "/health":
+            cache = self.batcher.cache
+            self._send_json(200, {
+                "status": "ok",
+                "model": self.metadata.get("nama_model", "Random Forest"),
+                "cache": cache.stats() if cache is not None else None,
+            })
+        elif self.path == "/metrics":
+            body = REGISTRY.render_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self._send_json(404, {"error": "Endpoint tidak ditemukan"})
+
+    def do_POST(self):
+        if self.path not in ("/predict", "/predict/batch"):
+            self._send_json(404, {"error": "Endpoint tidak ditemukan"})
+            return
+        try:
+            payload = self._read_json()
+            if self.path == "/predict":
+                rows = [validate_row(payload)]
+            else:
+                if isinstance(payload, dict):
+                    payload = payload.get("instances")
+                if not isinstance(payload, list):
+                    raise ValueError("Body harus berupa list atau {\"instances\": [...]}")
+                rows = [validate_row(row) for row in payload]
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+
+        try:
+            with timer("api_request"):
+                results = self.batcher.submit(rows).result() if rows else []
+        except Exception as e:
+            self._send_json(500, {"error": f"Error dalam prediksi: {str(e)}"})
+            return
+
+        if self.path == "/predict":
+            self._send_json(200, results[0])
+        else:
+            self._send_json(200, {"predictions": results})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class PredictionServer(ThreadingHTTPServer):
+    """ThreadingHTTPServer dengan antrean koneksi yang cukup untuk load test"""
+
+    request_queue_size = 128
+
+
+def create_server(components, host="127.0.0.1", port=8000,
+                  max_batch_size=DEFAULT_MAX_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS,
+                  cache=None):
+    """Membuat HTTP server yang berbagi satu MicroBatcher untuk semua thread"""
+    handler = type("Handler", (PredictionHandler,), {
+        "batcher": MicroBatcher(components, max_batch_size, max_wait_ms, cache),
+        "metadata": components[4],
+    })
+    return PredictionServer((host, port), handler)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HTTP API prediksi tingkat obesitas")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model-dir", default="deployment_files",
+                        help="Folder komponen model (default: deployment_files)")
+    parser.add_argument("--engine", choices=ENGINES, default="auto",
+                        help="Engine inferensi forest (default: auto)")
+    parser.add_argument("--variant", choices=MODEL_VARIANTS, default="teacher",
+                        help="Model guru atau murid hasil distilasi (default: teacher)")
+    parser.add_argument("--early-exit", type=float, metavar="AGREEMENT",
+                        help="Aktifkan mode anytime forest (1.0 = kelas dijamin sama)")
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE,
+                        help="Jumlah baris maksimum per micro-batch")
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="Waktu tunggu maksimum untuk mengisi micro-batch")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                        help="Jumlah input unik yang di-cache (0 = nonaktif)")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_CACHE_TTL,
+                        help="Masa berlaku entri cache dalam detik")
+    args = parser.parse_args(argv)
+
+    components = load_components(variant_dir(args.model_dir, args.variant), args.engine,
+                                 args.early_exit)
+    cache = PredictionCache(args.cache_size, args.cache_ttl) if args.cache_size > 0 else None
+    server = create_server(components, args.host, args.port,
+                           args.max_batch_size, args.max_wait_ms, cache)
+    print(f"🚀 API berjalan di http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,15 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import joblib
-import plotly.express as px
-import plotly.graph_objects as go
+import functools
 import warnings
 import os
+import io
+import threading
+import time
+
+from metrics import REGISTRY, observe, start_metrics_server, timer
+
+# Awal script run; pandas, plotly, dan modul model baru diimpor setelah form tampil
+SCRIPT_START = time.perf_counter()
 
 # Menonaktifkan peringatan yang tidak krusial untuk tampilan demo yang bersih
 warnings.filterwarnings("ignore")
@@ -196,8 +200,11 @@ def load_model_components():
     - Feature names (urutan fitur)
     - Metadata (informasi performa model)
     """
+    from scoring import load_components, variant_dir
+
     try:
-        base_dir = "deployment_files"
+        # MODEL_VARIANT: teacher (forest hasil training) atau student (hasil distillation.py)
+        base_dir = variant_dir("deployment_files", os.environ.get("MODEL_VARIANT", "teacher"))
         
         # Cek apakah folder ada
         if not os.path.exists(base_dir):
@@ -209,16 +216,20 @@ deployment_files/
 ├── scaler.pkl
 ├── label_encoder.pkl
 ├── feature_names.pkl
-└── model_metadata.pkl
+├── model_metadata.pkl
+└── model_bundle/        (opsional, dibuat dengan: python model_bundle.py build)
             """)
             return None, None, None, None, None
             
         # Load semua komponen
-        model = joblib.load(os.path.join(base_dir, "final_model.pkl"))
-        scaler = joblib.load(os.path.join(base_dir, "scaler.pkl"))
-        label_encoder = joblib.load(os.path.join(base_dir, "label_encoder.pkl"))
-        feature_names = joblib.load(os.path.join(base_dir, "feature_names.pkl"))
-        metadata = joblib.load(os.path.join(base_dir, "model_metadata.pkl"))
+        # MODEL_ENGINE: auto (bundle jika ada), sklearn, atau compiled
+        engine = os.environ.get("MODEL_ENGINE", "auto")
+        # EARLY_EXIT_AGREEMENT (opsional, misalnya 0.99): mode anytime forest
+        early_exit = os.environ.get("EARLY_EXIT_AGREEMENT")
+        with timer("load_model_components"):
+            model, scaler, label_encoder, feature_names, metadata = load_components(
+                base_dir, engine, float(early_exit) if early_exit else None
+            )
             
         return model, scaler, label_encoder, feature_names, metadata
         
@@ -231,113 +242,60 @@ deployment_files/
         return None, None, None, None, None
 
 
-def calculate_bmi(weight, height):
-    """Menghitung BMI berdasarkan berat dan tinggi badan"""
-    return weight / (height**2) if height > 0 else 0
-
+@st.cache_resource
+def get_prediction_cache():
+    """
+    Cache hasil prediksi yang dibagi semua sesi:
+    - Input yang sama (setelah dinormalisasi) tidak diprediksi ulang
+    - Entri kedaluwarsa setelah 1 jam
+    """
+    from prediction_cache import PredictionCache
 
-def categorize_age(age):
-    """Kategorisasi umur sesuai kelompok"""
-    if age < 18:
-        return "Remaja"
-    elif age < 25:
-        return "Dewasa Muda"
-    elif age < 35:
-        return "Dewasa"
-    elif age < 50:
-        return "Paruh Baya"
-    else:
-        return "Senior"
+    return PredictionCache(max_size=10_000, ttl_seconds=3600)
 
 
-def get_health_score(input_data, bmi):
+@st.cache_resource
+def load_similar_index(_scaler, feature_names):
     """
-    Menghitung skor kesehatan berdasarkan BMI dan gaya hidup
-    - Nilai dikurangi jika memiliki kebiasaan tidak sehat
-    - Rentang skor: 0–100
+    Index KD-tree responden mirip, sekali per proses:
+    - Dimuat dari deployment_files jika cocok dengan fitur model
+    - Selain itu dibangun dari dataset (None jika dataset tidak tersedia)
     """
-    score = 100
-    
-    # BMI impact
-    if bmi < 18.5 or bmi > 30:
-        score -= 30
-    elif bmi > 25:
-        score -= 15
-    
-    # Lifestyle factors
-    if input_data['FAF'] < 1:
-        score -= 15
-    if input_data['FCVC'] < 2:
-        score -= 10
-    if input_data['CH2O'] < 2:
-        score -= 10
-    if input_data['FAVC'] == 'yes':
-        score -= 10
-    if input_data['SMOKE'] == 'yes':
-        score -= 15
-    if input_data['TUE'] > 1.5:
-        score -= 5
-        
-    return max(0, score)
+    from neighbors import ensure_neighbor_index
 
+    with timer("load_neighbor_index"):
+        return ensure_neighbor_index(_scaler, list(feature_names), "deployment_files")
 
-def preprocess_input(input_data, scaler, feature_names):
+
+@st.cache_resource
+def load_population_index():
     """
-    Preprocessing input user:
-    - Hitung BMI
-    - Encode binary dan kategori
-    - One-hot encoding
-    - Normalisasi fitur numerik
+    Index populasi ObesityDataSet.csv, dibangun sekali per proses:
+    - Array terurut per gender/kelompok umur untuk persentil
+    - Sebaran kelas profil mirip
+    Mengembalikan None jika dataset tidak tersedia.
     """
-    processed_data = pd.DataFrame([input_data])
-    
-    # Hitung BMI
-    processed_data["BMI"] = calculate_bmi(
-        processed_data["Weight"].iloc[0], 
-        processed_data["Height"].iloc[0]
-    )
-    
-    # Kategorisasi umur
-    processed_data["Age_Group"] = categorize_age(processed_data["Age"].iloc[0])
-    
-    # Encoding binary columns
-    binary_columns = ["FAVC", "SCC", "SMOKE", "family_history_with_overweight"]
-    for col in binary_columns:
-        if col in processed_data.columns:
-            processed_data[f"{col}_encoded"] = (processed_data[col] == "yes").astype(int)
-    
-    # Gender encoding
-    processed_data["Gender_encoded"] = (processed_data["Gender"] == "Male").astype(int)
-    
-    # One-hot encoding untuk categorical features
-    categorical_to_encode = ["CALC", "CAEC", "MTRANS", "Age_Group"]
-    for col in categorical_to_encode:
-        if col in processed_data.columns:
-            dummies = pd.get_dummies(processed_data[col], prefix=col, drop_first=True)
-            processed_data = pd.concat([processed_data, dummies], axis=1)
-
-    # Pastikan semua features ada
-    for feature in feature_names:
-        if feature not in processed_data.columns:
-            processed_data[feature] = 0
-            
-    # Select hanya features yang diperlukan
-    processed_data = processed_data[feature_names]
+    from population import DATASET_PATH, build_population_index
 
-    # Scaling numerical features
-    numerical_features = [
-        "Age", "Height", "Weight", "BMI", "FCVC", "NCP", "CH2O", "FAF", "TUE"
-    ]
-    numerical_features_exist = [
-        col for col in numerical_features if col in processed_data.columns
-    ]
-    
-    if numerical_features_exist:
-        processed_data[numerical_features_exist] = scaler.transform(
-            processed_data[numerical_features_exist]
-        )
-        
-    return processed_data
+    if not os.path.exists(DATASET_PATH):
+        return None
+    with timer("load_population_index"):
+        return build_population_index(DATASET_PATH)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def compute_what_if(input_items, _components):
+    """Sweep what-if per input; ganti variabel di selectbox tidak memprediksi ulang"""
+    from what_if import sensitivity_sweep
+
+    return sensitivity_sweep(dict(input_items), _components)
+
+
+@st.cache_resource
+def get_metrics_server():
+    """Server Prometheus /metrics di thread terpisah, aktif jika METRICS_PORT diisi"""
+    port = os.environ.get("METRICS_PORT")
+    return start_metrics_server(int(port)) if port else None
 
 
 def get_obesity_info(obesity_class):
@@ -509,6 +467,8 @@ def create_bmi_gauge(bmi_value):
     Membuat visualisasi gauge (meteran) BMI dengan Plotly:
     - Menunjukkan posisi BMI dalam rentang sehat atau tidak
     """
+    import plotly.graph_objects as go
+
     fig = go.Figure(
         go.Indicator(
             mode="gauge+number+delta",
@@ -541,23 +501,27 @@ def create_bmi_gauge(bmi_value):
     return fig
 
 
+# Color mapping untuk setiap kelas
+CLASS_COLORS = {
+    "Insufficient Weight": "#3498db",
+    "Normal Weight": "#27ae60",
+    "Overweight Level I": "#f39c12",
+    "Overweight Level II": "#e67e22",
+    "Obesity Type I": "#e74c3c",
+    "Obesity Type II": "#c0392b",
+    "Obesity Type III": "#8e44ad"
+}
+
+
 def create_probability_chart(probabilities, class_names):
     """Membuat chart distribusi probabilitas prediksi"""
+    import pandas as pd
+    import plotly.express as px
+
     prob_df = pd.DataFrame(
         {"Class": class_names, "Probability": probabilities}
     ).sort_values("Probability", ascending=True)
     
-    # Color mapping untuk setiap kelas
-    color_map = {
-        "Insufficient Weight": "#3498db",
-        "Normal Weight": "#27ae60",
-        "Overweight Level I": "#f39c12",
-        "Overweight Level II": "#e67e22",
-        "Obesity Type I": "#e74c3c",
-        "Obesity Type II": "#c0392b",
-        "Obesity Type III": "#8e44ad"
-    }
-    
     fig = px.bar(
         prob_df,
         x="Probability",
@@ -565,7 +529,7 @@ def create_probability_chart(probabilities, class_names):
         orientation="h",
         title="Distribusi Probabilitas Prediksi",
         color="Class",
-        color_discrete_map=color_map
+        color_discrete_map=CLASS_COLORS
     )
     fig.update_layout(
         height=450,
@@ -590,6 +554,8 @@ def create_probability_chart(probabilities, class_names):
 
 def create_health_radar(input_data):
     """Create radar chart for health metrics"""
+    import plotly.graph_objects as go
+
     categories = ['Aktivitas Fisik', 'Konsumsi Sayur', 'Konsumsi Air', 
                   'Kontrol Kalori', 'Kebiasaan Sehat']
     
@@ -625,59 +591,164 @@ def create_health_radar(input_data):
     return fig
 
 
-# --- Aplikasi Utama ---
-def main():
-    # Load model components
-    result = load_model_components()
-    if result[0] is None:  # Jika ada error loading model
-        st.error("❌ Aplikasi tidak dapat dijalankan karena model tidak ditemukan.")
-        st.info("📚 Silakan ikuti dokumentasi untuk setup model files.")
-        return
-        
-    model, scaler, label_encoder, feature_names, metadata = result
+def create_what_if_chart(sweep, variable, current_value):
+    """Grafik probabilitas tiap kelas terhadap nilai satu variabel what-if"""
+    import plotly.express as px
 
-    # Header dengan animasi
-    st.markdown(
-        '<h1 class="title-text">🏃‍♂️Sistem Prediksi Tingkat Obesitas</h1>',
-        unsafe_allow_html=True,
+    from what_if import SWEEP_LABELS
+
+    data = sweep[sweep["variable"] == variable].drop(columns=["variable", "predicted_class"])
+    long = data.melt(id_vars="value", var_name="Class", value_name="Probability")
+    long["Class"] = long["Class"].str.replace("_", " ")
+
+    fig = px.line(
+        long,
+        x="value",
+        y="Probability",
+        color="Class",
+        color_discrete_map=CLASS_COLORS,
+        title=f"Simulasi What-If: {SWEEP_LABELS[variable]}",
     )
-    st.markdown(
-        '<p class="subtitle-text">Sistem Cerdas untuk Analisis Kesehatan & Prediksi Tingkat Obesitas dengan Teknologi Machine Learning</p>',
-        unsafe_allow_html=True,
+    fig.add_vline(x=current_value, line_dash="dash", line_color="gray",
+                  annotation_text="Nilai Anda")
+    fig.update_layout(
+        height=450,
+        title_x=0.5,
+        xaxis_title=SWEEP_LABELS[variable],
+        yaxis_title="Probabilitas",
+        yaxis=dict(tickformat='.0%', range=[0, 1]),
+        font={"family": "Poppins"},
+        legend_title_text="",
     )
+    return fig
+
+
+def create_attribution_chart(explanation, predicted_class, top_n=10):
+    """Bar horizontal fitur yang paling memengaruhi prediksi (atribusi tree-path)"""
+    import numpy as np
+    import plotly.express as px
+
+    data = explanation.head(top_n).iloc[::-1].copy()
+    data["feature"] = data["feature"].str.replace("_encoded", "")
+    data["Arah"] = np.where(data["contribution"] >= 0, "Mendorong", "Menahan")
+
+    fig = px.bar(
+        data,
+        x="contribution",
+        y="feature",
+        orientation="h",
+        color="Arah",
+        color_discrete_map={"Mendorong": "#e74c3c", "Menahan": "#27ae60"},
+        title=f"Faktor Penentu Prediksi: {predicted_class.replace('_', ' ')}",
+    )
+    fig.update_layout(
+        height=450,
+        title_x=0.5,
+        xaxis_title="Kontribusi ke probabilitas kelas",
+        yaxis_title="",
+        xaxis=dict(tickformat='+.0%'),
+        font={"family": "Poppins"},
+        legend_title_text="",
+    )
+    return fig
+
+
+def create_population_chart(distribution, group):
+    """Sebaran kelas obesitas responden dataset dengan profil mirip"""
+    import pandas as pd
+    import plotly.express as px
+
+    data = pd.DataFrame({
+        "Class": [c.replace("_", " ") for c in distribution.index],
+        "Proportion": distribution.to_numpy(),
+    })
+    fig = px.bar(
+        data,
+        x="Class",
+        y="Proportion",
+        color="Class",
+        color_discrete_map=CLASS_COLORS,
+        title=f"Kategori Responden dengan Profil Mirip ({group})",
+    )
+    fig.update_layout(
+        height=400,
+        title_x=0.5,
+        showlegend=False,
+        xaxis_title="",
+        yaxis_title="Proporsi",
+        yaxis=dict(tickformat='.0%'),
+        font={"family": "Poppins"},
+    )
+    return fig
+
+
+# --- Cache Grafik Plotly ---
+FIGURE_CACHE_SIZE = 64
+RADAR_FIELDS = ["FAF", "FCVC", "CH2O", "SCC", "SMOKE"]
+FIGURE_BUILDERS = {
+    "bmi_gauge": create_bmi_gauge,
+    "probability_chart": create_probability_chart,
+    "health_radar": create_health_radar,
+    "what_if_chart": create_what_if_chart,
+    "attribution_chart": create_attribution_chart,
+    "population_chart": create_population_chart,
+}
+
+
+# Penanda per thread script run: True jika build_figure benar-benar membuat Figure
+_FIGURE_BUILD = threading.local()
+
+
+@st.cache_data(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def build_figure(name, *args):
+    """
+    JSON Figure sekali per kombinasi input (cache terbatas FIGURE_CACHE_SIZE entri).
+    Yang disimpan berupa string JSON, sehingga setiap sesi mendapat Figure baru dan
+    tidak ada objek mutable yang dibagi antar sesi.
+    """
+    _FIGURE_BUILD.miss = True
+    return FIGURE_BUILDERS[name](*args).to_json()
+
+
+def get_figure(name, *args):
+    """
+    Mengambil Figure dari cache JSON dan mencatat waktunya:
+    - chart_<nama>: pembuatan Figure baru (cache miss)
+    - chart_<nama>_cache_hit: Figure direkonstruksi dari JSON di cache
+    Hit/miss dilaporkan oleh build_figure lewat penanda thread-local, bukan counter global.
+    """
+    # Import lokal: plotly baru dimuat saat grafik pertama dibuat
+    import plotly.io as pio
+
+    _FIGURE_BUILD.miss = False
+    start = time.perf_counter()
+    fig = pio.from_json(build_figure(name, *args))
+    stage = f"chart_{name}" if _FIGURE_BUILD.miss else f"chart_{name}_cache_hit"
+    observe(stage, time.perf_counter() - start)
+    return fig
+
+
+# --- Fragment ---
+def timed_fragment(name):
+    """
+    st.fragment yang mencatat durasi tiap eksekusinya ke metrik fragment_<nama>:
+    - Interaksi widget di dalam fragment hanya menjalankan ulang fungsi tersebut
+    - Full rerun tetap menjalankan semua fragment
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(f"fragment_{name}"):
+                return func(*args, **kwargs)
+        return st.fragment(wrapper)
+    return decorator
+
+
+# --- Sidebar ---
+def render_sidebar(metadata, prediction_cache):
+    """Informasi model, cache, metrik latency, dan dataset di sidebar"""
+    import pandas as pd
 
-    # Quick Stats
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        st.markdown("""
-        <div class="metric-container">
-            <h3>97.56%</h3>
-            <p>Akurasi Model</p>
-        </div>
-        """, unsafe_allow_html=True)
-    with col2:
-        st.markdown("""
-        <div class="metric-container">
-            <h3>2,111</h3>
-            <p>Data Training</p>
-        </div>
-        """, unsafe_allow_html=True)
-    with col3:
-        st.markdown("""
-        <div class="metric-container">
-            <h3>7</h3>
-            <p>Kategori Obesitas</p>
-        </div>
-        """, unsafe_allow_html=True)
-    with col4:
-        st.markdown("""
-        <div class="metric-container">
-            <h3>17</h3>
-            <p>Parameter Analisis</p>
-        </div>
-        """, unsafe_allow_html=True)
-    
-    # Sidebar dengan informasi detail
     with st.sidebar:
         st.markdown("### 🤖 Model AI Information")
         
@@ -688,6 +759,27 @@ def main():
             st.write(f"**Precision**: 97.59%")
             st.write(f"**Recall**: 97.56%")
 
+        with st.expander("🗃️ Cache Prediksi"):
+            cache_stats = prediction_cache.stats()
+            st.write(f"**Entri**: {cache_stats['size']:,} / {cache_stats['max_size']:,}")
+            st.write(f"**Hit**: {cache_stats['hits']:,}")
+            st.write(f"**Miss**: {cache_stats['misses']:,}")
+            st.write(f"**Hit Rate**: {cache_stats['hit_rate']:.1%}")
+
+        with st.expander("🛠️ Admin: Metrik Latency"):
+            latency = pd.DataFrame.from_dict(REGISTRY.summary(), orient="index")
+            if latency.empty:
+                st.write("Belum ada data latency")
+            else:
+                st.dataframe(latency.round(2), use_container_width=True)
+            st.download_button(
+                label="📥 Unduh Metrik (Prometheus)",
+                data=REGISTRY.render_prometheus(),
+                file_name="metrics.txt",
+                mime="text/plain",
+                on_click="ignore",
+            )
+
         with st.expander("🎯 Kategori Obesitas (NObeyesdad)"):
             classes_info = {
                 "1️⃣ Insufficient Weight": "BMI < 18.5",
@@ -738,9 +830,494 @@ def main():
             st.write("")
             st.write("🔗 [GitHub Repository](https://github.com/Firmanarpp/Capstone_Bengkod_DS01_Firman.git)")
 
+
+# --- Tab Batch: Prediksi dari File CSV ---
+@timed_fragment("batch")
+def render_batch_tab(components, prediction_cache):
+    """Upload CSV, scoring batch, dan unduh hasil; tombol-tombolnya hanya me-rerun tab ini"""
+    import pandas as pd
+
+    from attribution import explain_csv
+    from scoring import OUTPUT_COLUMNS, score_csv
+
+    st.markdown("### 📂 Prediksi Batch dari File CSV")
+    st.write(
+        "Unggah file CSV dengan 16 kolom prediktor yang sama seperti `ObesityDataSet.csv`. "
+        "Setiap baris akan diberi kelas prediksi, confidence, BMI, dan health score."
+    )
+
+    uploaded_file = st.file_uploader("Pilih file CSV", type=["csv"])
+    with_explanation = st.checkbox(
+        "Sertakan 3 fitur pendorong teratas per baris",
+        help="Menambahkan kolom top_feature_i dan top_contribution_i (atribusi tree-path)",
+    )
+    if uploaded_file is not None and st.button("🚀 Prediksi Semua Baris"):
+        with st.spinner("🔄 Memprediksi seluruh baris data..."):
+            try:
+                output = io.StringIO()
+                score = explain_csv if with_explanation else score_csv
+                total_rows = score(
+                    uploaded_file, output, components, cache=prediction_cache
+                )
+                st.session_state.batch_result = output.getvalue()
+                st.success(f"✅ {total_rows:,} baris berhasil diprediksi")
+            except Exception as e:
+                st.session_state.batch_result = None
+                st.error(f"❌ Error dalam prediksi batch: {str(e)}")
+
+    if st.session_state.get("batch_result"):
+        preview = pd.read_csv(io.StringIO(st.session_state.batch_result), nrows=20)
+        columns = OUTPUT_COLUMNS + [
+            col for col in preview.columns
+            if col in ("calibrated_confidence", "confidence_truncated") or col.startswith("top_")
+        ]
+        st.dataframe(preview[columns], use_container_width=True)
+        st.download_button(
+            label="📥 Unduh Hasil Prediksi",
+            data=st.session_state.batch_result,
+            file_name="hasil_prediksi.csv",
+            mime="text/csv",
+            on_click="ignore",
+        )
+
+
+# --- Tab 2: Dashboard Kesehatan ---
+@timed_fragment("dashboard")
+def render_dashboard_tab(components):
+    """Dashboard hasil prediksi terakhir; ganti variabel what-if hanya me-rerun tab ini"""
+    from preprocessing import AGE_LABELS, categorize_age
+    from what_if import SWEEP_LABELS, SWEEP_RANGES
+
+    st.header("📊 Dashboard Kesehatan Personal", divider="rainbow")
+    
+    if st.session_state.last_prediction:
+        input_data = st.session_state.last_prediction["input_data"]
+        bmi_val = st.session_state.last_prediction["bmi"]
+        health_score = st.session_state.last_prediction["health_score"]
+
+        # Summary cards
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            with st.container():
+                st.markdown("### 👤 Profil Kesehatan")
+                st.metric("Usia", f"{input_data['Age']} tahun ({AGE_LABELS[categorize_age(input_data['Age'])]})")
+                st.metric("BMI", f"{bmi_val:.1f}")
+                st.metric("Health Score", f"{health_score}/100")
+                
+        with col2:
+            with st.container():
+                st.markdown("### 🎯 Target Kesehatan")
+                ideal_weight = 22.5 * (input_data['Height'] ** 2)
+                weight_diff = input_data['Weight'] - ideal_weight
+                st.metric("Berat Ideal", f"{ideal_weight:.1f} kg")
+                st.metric("Selisih Berat", f"{weight_diff:+.1f} kg")
+                if weight_diff > 0:
+                    st.write("📉 Perlu menurunkan berat badan")
+                elif weight_diff < -5:
+                    st.write("📈 Perlu menaikkan berat badan")
+                else:
+                    st.write("✅ Berat badan ideal!")
+                    
+        with col3:
+            with st.container():
+                st.markdown("### 📈 Statistik Gaya Hidup")
+                active_days = input_data['FAF'] * 7 / 3
+                st.metric("Hari Aktif/Minggu", f"{active_days:.0f} hari")
+                st.metric("Konsumsi Sayur", f"{input_data['FCVC']:.1f}/3.0")
+                st.metric("Screen Time", f"{input_data['TUE']:.1f} jam/hari")
+
+        # Health radar chart
+        radar_input = {field: input_data[field] for field in RADAR_FIELDS}
+        st.plotly_chart(get_figure("health_radar", radar_input), use_container_width=True)
+
+        # Population comparison
+        population = load_population_index()
+        if population is not None:
+            st.markdown("### 👥 Perbandingan dengan Populasi")
+            comparison = population.compare(input_data, bmi_val)
+            st.write(
+                f"Posisi Anda dibanding {comparison['group_size']:,} responden "
+                f"dataset pada kelompok **{comparison['group']}**."
+            )
+            percentile_labels = {
+                "BMI": "Persentil BMI",
+                "FAF": "Persentil Aktivitas Fisik",
+                "CH2O": "Persentil Konsumsi Air",
+            }
+            for col, (metric, value) in zip(st.columns(3), comparison["percentiles"].items()):
+                with col:
+                    st.metric(percentile_labels[metric], f"{value:.0f}")
+            if comparison["n_similar"]:
+                st.plotly_chart(
+                    get_figure("population_chart", comparison["similar"],
+                               f"{comparison['n_similar']} orang"),
+                    use_container_width=True,
+                )
+
+        # Lifestyle analysis
+        st.markdown("### 🏃‍♂️ Analisis Gaya Hidup Detail")
+        
+        lifestyle_scores = {
+            "Aktivitas Fisik": (input_data['FAF'] / 3 * 100, "🏃‍♂️"),
+            "Nutrisi Sayuran": (input_data['FCVC'] / 3 * 100, "🥬"),
+            "Hidrasi": (input_data['CH2O'] / 3 * 100, "💧"),
+            "Kontrol Kalori": (100 if input_data['SCC'] == 'yes' else 0, "📊"),
+            "Bebas Rokok": (100 if input_data['SMOKE'] == 'no' else 0, "🚭")
+        }
+        
+        for aspect, (score, icon) in lifestyle_scores.items():
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.write(f"{icon} **{aspect}**")
+                st.progress(score / 100)
+            with col2:
+                if score >= 80:
+                    st.success(f"{score:.0f}%")
+                elif score >= 50:
+                    st.warning(f"{score:.0f}%")
+                else:
+                    st.error(f"{score:.0f}%")
+
+        # What-if analysis
+        st.markdown("### 🔮 Simulasi What-If")
+        st.write(
+            "Lihat bagaimana probabilitas setiap kategori berubah jika satu kebiasaan "
+            "diubah sementara data lainnya tetap."
+        )
+        sweep = compute_what_if(tuple(input_data.items()), components)
+        variable = st.selectbox(
+            "Variabel yang disimulasikan", list(SWEEP_RANGES), format_func=SWEEP_LABELS.get
+        )
+        st.plotly_chart(
+            get_figure("what_if_chart", sweep, variable, input_data[variable]),
+            use_container_width=True,
+        )
+    else:
+        st.info("💡 Lakukan prediksi terlebih dahulu untuk melihat dashboard kesehatan Anda")
+
+
+# --- Tab 3: Panduan Kesehatan ---
+@timed_fragment("guide")
+def render_guide_tab():
+    """Panduan kesehatan; pilihan topik hanya me-rerun tab ini"""
+    st.header("📚 Panduan Kesehatan Komprehensif", divider="rainbow")
+    
+    health_guide = st.selectbox(
+        "Pilih topik panduan:",
+        ["Nutrisi Seimbang", "Program Olahraga", "Manajemen Berat Badan", "Kesehatan Mental"]
+    )
+    
+    if health_guide == "Nutrisi Seimbang":
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("""
+            ### 🥗 Prinsip Nutrisi Seimbang
+            
+            **1. Piramida Makanan Sehat**
+            - 🌾 Karbohidrat kompleks (40%)
+            - 🥬 Sayur & buah (35%)
+            - 🥩 Protein (15%)
+            - 🥛 Susu & produk olahan (10%)
+            
+            **2. Porsi Ideal Sekali Makan**
+            - ½ piring: Sayuran & buah
+            - ¼ piring: Protein
+            - ¼ piring: Karbohidrat
+            - Minum: Air putih
+            """)
+            
+        with col2:
+            st.markdown("""
+            ### 🍎 Tips Makan Sehat
+            
+            **✅ Yang Dianjurkan:**
+            - Makan 3x sehari dengan teratur
+            - Konsumsi 5 porsi sayur & buah/hari
+            - Pilih karbohidrat kompleks
+            - Minum 8 gelas air/hari
+            
+            **❌ Yang Dihindari:**
+            - Skip makan
+            - Makanan tinggi gula & garam
+            - Gorengan berlebihan
+            - Minuman bersoda
+            """)
+            
+    elif health_guide == "Program Olahraga":
+        st.markdown("""
+        ### 💪 Program Olahraga Terstruktur
+        
+        #### Pemula (Minggu 1-4)
+        - **Senin & Kamis**: Jalan kaki 20 menit
+        - **Selasa & Jumat**: Stretching 15 menit
+        - **Rabu**: Istirahat aktif (aktivitas ringan)
+        - **Weekend**: Aktivitas menyenangkan (berenang, bersepeda santai)
+        
+        #### Menengah (Minggu 5-8)
+        - **Senin & Kamis**: Jogging 30 menit
+        - **Selasa & Jumat**: Strength training ringan
+        - **Rabu**: Yoga atau pilates
+        - **Weekend**: Olahraga tim atau hiking
+        
+        #### Lanjutan (Minggu 9+)
+        - **Senin & Kamis**: HIIT 40 menit
+        - **Selasa & Jumat**: Weight training
+        - **Rabu**: Cardio steady state
+        - **Weekend**: Kombinasi aktivitas
+        """)
+        
+    elif health_guide == "Manajemen Berat Badan":
+        tab_a, tab_b = st.tabs(["Menurunkan Berat", "Menaikkan Berat"])
+        
+        with tab_a:
+            st.markdown("""
+            ### 📉 Strategi Penurunan Berat Badan Sehat
+            
+            **Target Realistis**: 0.5-1 kg per minggu
+            
+            **1. Defisit Kalori**
+            - Kurangi 500-750 kalori/hari dari kebutuhan
+            - Tracking makanan dengan aplikasi
+            - Fokus pada makanan mengenyangkan rendah kalori
+            
+            **2. Olahraga Efektif**
+            - Kombinasi cardio & strength training
+            - Minimal 150 menit/minggu intensitas sedang
+            - HIIT untuk pembakaran maksimal
+            
+            **3. Perubahan Gaya Hidup**
+            - Tidur 7-8 jam/hari
+            - Kelola stress
+            - Makan mindful (tidak sambil nonton TV)
+            """)
+            
+        with tab_b:
+            st.markdown("""
+            ### 📈 Strategi Penambahan Berat Badan Sehat
+            
+            **Target Realistis**: 0.25-0.5 kg per minggu
+            
+            **1. Surplus Kalori**
+            - Tambah 300-500 kalori/hari
+            - Fokus pada kalori berkualitas
+            - Makan lebih sering (5-6x/hari)
+            
+            **2. Latihan Kekuatan**
+            - Weight training 3-4x/minggu
+            - Progressive overload
+            - Istirahat cukup antar sesi
+            
+            **3. Nutrisi Optimal**
+            - Protein 1.5-2g/kg berat badan
+            - Karbohidrat kompleks
+            - Lemak sehat (alpukat, kacang)
+            """)
+            
+    else:  # Kesehatan Mental
+        st.markdown("""
+        ### 🧠 Kesehatan Mental & Manajemen Stress
+        
+        #### Teknik Relaksasi
+        1. **Breathing Exercise (4-7-8)**
+           - Tarik napas 4 detik
+           - Tahan 7 detik
+           - Hembuskan 8 detik
+           - Ulangi 3-4x
+        
+        2. **Progressive Muscle Relaxation**
+           - Tegangkan otot 5 detik
+           - Lepaskan dan rasakan relaksasi
+           - Mulai dari kaki hingga kepala
+        
+        #### Mindfulness & Meditasi
+        - Meditasi 10 menit/hari
+        - Journaling untuk self-reflection
+        - Gratitude practice sebelum tidur
+        
+        #### Support System
+        - Berbagi dengan orang terdekat
+        - Konsultasi profesional jika perlu
+        - Join komunitas dengan minat sama
+        """)
+
+
+# --- Tab 4: Tentang Proyek ---
+def render_about_tab():
+    """Informasi proyek (statis)"""
+    st.header("ℹ️ Informasi Proyek", divider="rainbow")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        with st.container():
+            st.markdown("""
+            ### 🎓 Latar Belakang Proyek
+            
+            **Capstone Project Data Science**  
+            Bengkel Koding - Universitas Dian Nuswantoro
+            
+            Proyek ini dikembangkan sebagai solusi berbasis AI untuk membantu 
+            masyarakat dalam memahami dan mengelola risiko obesitas melalui 
+            analisis komprehensif dari berbagai faktor gaya hidup.
+            
+            **Motivasi:**
+            - Meningkatnya prevalensi obesitas global
+            - Kebutuhan akan tools prediksi yang akurat
+            - Edukasi kesehatan yang personalized
+            
+            **Dataset:**
+            - Sumber: 3 negara Amerika Latin
+            - Jumlah data: 2,111 sampel
+            - Features: 17 atribut
+            - Target: NObeyesdad (7 kategori)
+            """)
+            
+            st.markdown("""
+            ### 🔬 Metodologi Penelitian
+            
+            1. **Data Collection & Preparation**
+               - Dataset dari Mexico, Peru, Colombia
+               - 77% data sintetis (SMOTE)
+               - 23% data riil 
+            
+            2. **Exploratory Data Analysis**
+               - Distribusi data & outlier detection
+               - Feature correlation analysis
+               - Pattern identification
+            
+            3. **Feature Engineering**
+               - BMI calculation
+               - Age group categorization
+               - Binary & categorical encoding
+            """)
+            
+    with col2:
+        with st.container():
+            st.markdown("""
+            ### 🤖 Model Development
+            
+            **Algoritma yang Diuji:**
+            - Random Forest ✅ (Terpilih)
+            - Gradient Boosting
+            - Support Vector Machine
+            
+            **Optimasi:**
+            - SMOTE untuk handle imbalance
+            - RandomizedSearchCV untuk hyperparameter tuning
+            - Cross-validation 5-fold
+            
+            **Hasil Akhir:**
+            - Accuracy: 97.56%
+            - F1-Score: 97.55%
+            """)
+            
+            st.markdown("""
+            ### 👨‍💻 Tim Pengembang
+            
+            **Developer:**  
+            Firman Naufal Aryaputra  
+            NIM: A11.2022.14181  
+            Teknik Informatika UDINUS
+            
+            **Pembimbing:**  
+            Tim Dosen Bengkel Koding Data Science
+            
+            **Tech Stack:**
+            - Python
+            - Streamlit for web app
+            - Plotly for visualizations
+            - Joblib for model deployment
+            
+            
+            🔗 **Repository:** [GitHub](https://github.com/Firmanarpp/Capstone_Bengkod_DS01_Firman.git)
+            """)
+    
+    # Project requirements info
+    st.markdown("### 📋 Requirements Project")
+    
+    req_cols = st.columns(3)
+    with req_cols[0]:
+        st.info("""
+        **EDA & Preprocessing**
+        - Missing values handling
+        - Outlier detection
+        - Feature scaling
+        - Class imbalance (SMOTE)
+        """)
+    with req_cols[1]:
+        st.warning("""
+        **Modeling**
+        - Min. 3 algoritma
+        - Model comparison
+        - Hyperparameter tuning
+        - Cross validation
+        """)
+    with req_cols[2]:
+        st.success("""
+        **Deployment**
+        - Streamlit app
+        - GitHub repository
+        - Online deployment
+        - Demo presentation
+        """)
+    
+    # Disclaimer
+    st.warning("""
+    ### ⚠️ Disclaimer Penting
+    
+    Aplikasi ini dikembangkan untuk tujuan edukasi dan penelitian dalam rangka 
+    Capstone Project Bengkel Koding Data Science UDINUS. Hasil prediksi tidak dapat 
+    menggantikan konsultasi dengan profesional kesehatan. Selalu konsultasikan 
+    kondisi kesehatan Anda dengan dokter atau ahli gizi tersertifikasi untuk 
+    mendapatkan diagnosa dan treatment yang tepat.
+    """,)
+
+
+# --- Aplikasi Utama ---
+def main():
+    # Header dengan animasi
+    st.markdown(
+        '<h1 class="title-text">🏃‍♂️Sistem Prediksi Tingkat Obesitas</h1>',
+        unsafe_allow_html=True,
+    )
+    st.markdown(
+        '<p class="subtitle-text">Sistem Cerdas untuk Analisis Kesehatan & Prediksi Tingkat Obesitas dengan Teknologi Machine Learning</p>',
+        unsafe_allow_html=True,
+    )
+
+    # Quick Stats
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.markdown("""
+        <div class="metric-container">
+            <h3>97.56%</h3>
+            <p>Akurasi Model</p>
+        </div>
+        """, unsafe_allow_html=True)
+    with col2:
+        st.markdown("""
+        <div class="metric-container">
+            <h3>2,111</h3>
+            <p>Data Training</p>
+        </div>
+        """, unsafe_allow_html=True)
+    with col3:
+        st.markdown("""
+        <div class="metric-container">
+            <h3>7</h3>
+            <p>Kategori Obesitas</p>
+        </div>
+        """, unsafe_allow_html=True)
+    with col4:
+        st.markdown("""
+        <div class="metric-container">
+            <h3>17</h3>
+            <p>Parameter Analisis</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
     # Tabs dengan ikon yang lebih menarik
-    tab1, tab2, tab3, tab4 = st.tabs(
-        ["🎯 **Prediksi & Analisis**", "📈 **Dashboard Kesehatan**", "📚 **Panduan Kesehatan**", "ℹ️ **Tentang Proyek**"]
+    tab1, tab_batch, tab2, tab3, tab4 = st.tabs(
+        ["🎯 **Prediksi & Analisis**", "📂 **Prediksi Batch**", "📈 **Dashboard Kesehatan**", "📚 **Panduan Kesehatan**", "ℹ️ **Tentang Proyek**"]
     )
 
     # --- Tab 1: Prediksi ---
@@ -810,6 +1387,28 @@ def main():
                     use_container_width=True,
                 )
 
+        # Form sudah tampil; model dan modul berat baru dimuat setelah ini
+        first_form = time.perf_counter() - SCRIPT_START
+        observe("script_first_form", first_form)
+        if REGISTRY.count("script_run") == 0:
+            observe("cold_start_first_form", first_form)
+
+        from attribution import explain_prediction
+        from neighbors import similar_respondents
+        from scoring import predict
+
+        with st.spinner("⏳ Memuat model..."):
+            result = load_model_components()
+        if result[0] is None:  # Jika ada error loading model
+            st.error("❌ Aplikasi tidak dapat dijalankan karena model tidak ditemukan.")
+            st.info("📚 Silakan ikuti dokumentasi untuk setup model files.")
+            return
+
+        model, scaler, label_encoder, feature_names, metadata = result
+        prediction_cache = get_prediction_cache()
+        get_metrics_server()
+        render_sidebar(metadata, prediction_cache)
+
         # Inisialisasi session state
         if "last_prediction" not in st.session_state:
             st.session_state.last_prediction = None
@@ -836,26 +1435,36 @@ def main():
             
             with st.spinner("🔄 Menganalisis data kesehatan Anda..."):
                 try:
-                    # Preprocessing
-                    processed_input = preprocess_input(input_data, scaler, feature_names)
-                    
-                    # Prediksi
-                    prediction = model.predict(processed_input)[0]
-                    probabilities = model.predict_proba(processed_input)[0]
-                    predicted_class = label_encoder.inverse_transform([prediction])[0]
-                    
-                    # Hitung BMI dan health score
-                    bmi = calculate_bmi(weight, height)
-                    health_score = get_health_score(input_data, bmi)
+                    # Prediksi (preprocessing, satu kali predict_proba, BMI, health score)
+                    with timer("predict_total"):
+                        prediction = predict(input_data, result, prediction_cache)
+                    try:
+                        explanation = explain_prediction(input_data, result)[1]
+                    except ValueError:
+                        explanation = None
+                    neighbor_index = load_similar_index(scaler, tuple(feature_names))
+                    neighbors = None
+                    if neighbor_index is not None:
+                        try:
+                            with timer("similar_respondents"):
+                                neighbors = similar_respondents(
+                                    input_data, scaler, feature_names, neighbor_index
+                                )
+                        except ValueError as e:
+                            st.warning(f"⚠️ {e}")
 
                     # Simpan ke session state
                     st.session_state.last_prediction = {
                         "input_data": input_data,
-                        "prediction": prediction,
-                        "probabilities": probabilities,
-                        "predicted_class": predicted_class,
-                        "bmi": bmi,
-                        "health_score": health_score
+                        "prediction": prediction.prediction,
+                        "probabilities": prediction.probabilities,
+                        "predicted_class": prediction.predicted_class,
+                        "bmi": prediction.bmi,
+                        "health_score": prediction.health_score,
+                        "calibrated_confidence": prediction.calibrated_confidence,
+                        "confidence_truncated": prediction.confidence_truncated,
+                        "explanation": explanation,
+                        "neighbors": neighbors,
                     }
                     
                 except Exception as e:
@@ -873,11 +1482,25 @@ def main():
             # Main results
             col_res1, col_res2 = st.columns([1, 1])
             with col_res1:
+                if res.get("calibrated_confidence") is not None:
+                    confidence_line = (
+                        f'<p>Confidence Level (terkalibrasi): '
+                        f'<strong>{res["calibrated_confidence"]:.1%}</strong></p>'
+                    )
+                elif res.get("confidence_truncated"):
+                    confidence_line = (
+                        f'<p>Confidence Level (early exit, perkiraan): '
+                        f'<strong>{res["probabilities"].max():.1%}</strong></p>'
+                    )
+                else:
+                    confidence_line = (
+                        f'<p>Confidence Level: <strong>{res["probabilities"].max():.1%}</strong></p>'
+                    )
                 st.markdown(
                     f'<div class="result-highlight-card">'
                     f'<p class="label">Status Kesehatan Anda</p>'
                     f'<p class="result">{res["predicted_class"].replace("_", " ")}</p>'
-                    f'<p>Confidence Level: <strong>{res["probabilities"].max():.1%}</strong></p>'
+                    f'{confidence_line}'
                     f'<p>Health Score: <strong>{res["health_score"]}/100</strong></p>'
                     f'</div>',
                     unsafe_allow_html=True,
@@ -895,7 +1518,7 @@ def main():
                     st.error("Perlu perhatian serius pada kesehatan Anda.")
                     
             with col_res2:
-                st.plotly_chart(create_bmi_gauge(res["bmi"]), use_container_width=True)
+                st.plotly_chart(get_figure("bmi_gauge", res["bmi"]), use_container_width=True)
 
             # Detailed recommendations
             st.markdown("### 📋 Analisis Detail & Rekomendasi")
@@ -921,350 +1544,47 @@ def main():
             with st.container():
                 class_names = [c.replace("_", " ") for c in label_encoder.classes_]
                 st.plotly_chart(
-                    create_probability_chart(res["probabilities"], class_names),
+                    get_figure("probability_chart", res["probabilities"], class_names),
                     use_container_width=True,
                 )
 
-    # --- Tab 2: Dashboard Kesehatan ---
-    with tab2:
-        st.header("📊 Dashboard Kesehatan Personal", divider="rainbow")
-        
-        if st.session_state.last_prediction:
-            input_data = st.session_state.last_prediction["input_data"]
-            bmi_val = st.session_state.last_prediction["bmi"]
-            health_score = st.session_state.last_prediction["health_score"]
-
-            # Summary cards
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                with st.container():
-                    st.markdown("### 👤 Profil Kesehatan")
-                    st.metric("Usia", f"{input_data['Age']} tahun ({categorize_age(input_data['Age'])})")
-                    st.metric("BMI", f"{bmi_val:.1f}")
-                    st.metric("Health Score", f"{health_score}/100")
-                    
-            with col2:
-                with st.container():
-                    st.markdown("### 🎯 Target Kesehatan")
-                    ideal_weight = 22.5 * (input_data['Height'] ** 2)
-                    weight_diff = input_data['Weight'] - ideal_weight
-                    st.metric("Berat Ideal", f"{ideal_weight:.1f} kg")
-                    st.metric("Selisih Berat", f"{weight_diff:+.1f} kg")
-                    if weight_diff > 0:
-                        st.write("📉 Perlu menurunkan berat badan")
-                    elif weight_diff < -5:
-                        st.write("📈 Perlu menaikkan berat badan")
-                    else:
-                        st.write("✅ Berat badan ideal!")
-                        
-            with col3:
-                with st.container():
-                    st.markdown("### 📈 Statistik Gaya Hidup")
-                    active_days = input_data['FAF'] * 7 / 3
-                    st.metric("Hari Aktif/Minggu", f"{active_days:.0f} hari")
-                    st.metric("Konsumsi Sayur", f"{input_data['FCVC']:.1f}/3.0")
-                    st.metric("Screen Time", f"{input_data['TUE']:.1f} jam/hari")
+            # Feature attribution
+            if res.get("explanation") is not None:
+                st.markdown("### 🧭 Mengapa Hasilnya Seperti Ini?")
+                st.caption(
+                    "Kontribusi tiap fitur terhadap probabilitas kelas yang diprediksi, "
+                    "dihitung dari jalur keputusan setiap pohon Random Forest."
+                )
+                st.plotly_chart(
+                    get_figure("attribution_chart", res["explanation"], res["predicted_class"]),
+                    use_container_width=True,
+                )
 
-            # Health radar chart
-            st.plotly_chart(create_health_radar(input_data), use_container_width=True)
+            # Similar respondents
+            if res.get("neighbors") is not None:
+                st.markdown("### 🧑‍🤝‍🧑 Responden Paling Mirip")
+                st.caption(
+                    "Responden dataset terdekat dengan data Anda pada ruang fitur yang sama "
+                    "dengan input model (setelah scaling), beserta kategori aslinya."
+                )
+                neighbors = res["neighbors"].rename(columns={
+                    "distance": "Jarak", "Gender": "Jenis Kelamin", "Age": "Usia",
+                    "Height": "Tinggi", "Weight": "Berat", "NObeyesdad": "Kategori",
+                })
+                st.dataframe(neighbors.round(2), use_container_width=True, hide_index=True)
 
-            # Lifestyle analysis
-            st.markdown("### 🏃‍♂️ Analisis Gaya Hidup Detail")
-            
-            lifestyle_scores = {
-                "Aktivitas Fisik": (input_data['FAF'] / 3 * 100, "🏃‍♂️"),
-                "Nutrisi Sayuran": (input_data['FCVC'] / 3 * 100, "🥬"),
-                "Hidrasi": (input_data['CH2O'] / 3 * 100, "💧"),
-                "Kontrol Kalori": (100 if input_data['SCC'] == 'yes' else 0, "📊"),
-                "Bebas Rokok": (100 if input_data['SMOKE'] == 'no' else 0, "🚭")
-            }
-            
-            for aspect, (score, icon) in lifestyle_scores.items():
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    st.write(f"{icon} **{aspect}**")
-                    st.progress(score / 100)
-                with col2:
-                    if score >= 80:
-                        st.success(f"{score:.0f}%")
-                    elif score >= 50:
-                        st.warning(f"{score:.0f}%")
-                    else:
-                        st.error(f"{score:.0f}%")
-        else:
-            st.info("💡 Lakukan prediksi terlebih dahulu untuk melihat dashboard kesehatan Anda")
-
-    # --- Tab 3: Panduan Kesehatan ---
+    # Tab lain dirender oleh fragment: interaksi widget di dalamnya hanya
+    # menjalankan ulang fragment tersebut, bukan seluruh aplikasi
+    with tab_batch:
+        render_batch_tab(result, prediction_cache)
+    with tab2:
+        render_dashboard_tab(result)
     with tab3:
-        st.header("📚 Panduan Kesehatan Komprehensif", divider="rainbow")
-        
-        health_guide = st.selectbox(
-            "Pilih topik panduan:",
-            ["Nutrisi Seimbang", "Program Olahraga", "Manajemen Berat Badan", "Kesehatan Mental"]
-        )
-        
-        if health_guide == "Nutrisi Seimbang":
-            col1, col2 = st.columns(2)
-            with col1:
-                st.markdown("""
-                ### 🥗 Prinsip Nutrisi Seimbang
-                
-                **1. Piramida Makanan Sehat**
-                - 🌾 Karbohidrat kompleks (40%)
-                - 🥬 Sayur & buah (35%)
-                - 🥩 Protein (15%)
-                - 🥛 Susu & produk olahan (10%)
-                
-                **2. Porsi Ideal Sekali Makan**
-                - ½ piring: Sayuran & buah
-                - ¼ piring: Protein
-                - ¼ piring: Karbohidrat
-                - Minum: Air putih
-                """)
-                
-            with col2:
-                st.markdown("""
-                ### 🍎 Tips Makan Sehat
-                
-                **✅ Yang Dianjurkan:**
-                - Makan 3x sehari dengan teratur
-                - Konsumsi 5 porsi sayur & buah/hari
-                - Pilih karbohidrat kompleks
-                - Minum 8 gelas air/hari
-                
-                **❌ Yang Dihindari:**
-                - Skip makan
-                - Makanan tinggi gula & garam
-                - Gorengan berlebihan
-                - Minuman bersoda
-                """)
-                
-        elif health_guide == "Program Olahraga":
-            st.markdown("""
-            ### 💪 Program Olahraga Terstruktur
-            
-            #### Pemula (Minggu 1-4)
-            - **Senin & Kamis**: Jalan kaki 20 menit
-            - **Selasa & Jumat**: Stretching 15 menit
-            - **Rabu**: Istirahat aktif (aktivitas ringan)
-            - **Weekend**: Aktivitas menyenangkan (berenang, bersepeda santai)
-            
-            #### Menengah (Minggu 5-8)
-            - **Senin & Kamis**: Jogging 30 menit
-            - **Selasa & Jumat**: Strength training ringan
-            - **Rabu**: Yoga atau pilates
-            - **Weekend**: Olahraga tim atau hiking
-            
-            #### Lanjutan (Minggu 9+)
-            - **Senin & Kamis**: HIIT 40 menit
-            - **Selasa & Jumat**: Weight training
-            - **Rabu**: Cardio steady state
-            - **Weekend**: Kombinasi aktivitas
-            """)
-            
-        elif health_guide == "Manajemen Berat Badan":
-            tab_a, tab_b = st.tabs(["Menurunkan Berat", "Menaikkan Berat"])
-            
-            with tab_a:
-                st.markdown("""
-                ### 📉 Strategi Penurunan Berat Badan Sehat
-                
-                **Target Realistis**: 0.5-1 kg per minggu
-                
-                **1. Defisit Kalori**
-                - Kurangi 500-750 kalori/hari dari kebutuhan
-                - Tracking makanan dengan aplikasi
-                - Fokus pada makanan mengenyangkan rendah kalori
-                
-                **2. Olahraga Efektif**
-                - Kombinasi cardio & strength training
-                - Minimal 150 menit/minggu intensitas sedang
-                - HIIT untuk pembakaran maksimal
-                
-                **3. Perubahan Gaya Hidup**
-                - Tidur 7-8 jam/hari
-                - Kelola stress
-                - Makan mindful (tidak sambil nonton TV)
-                """)
-                
-            with tab_b:
-                st.markdown("""
-                ### 📈 Strategi Penambahan Berat Badan Sehat
-                
-                **Target Realistis**: 0.25-0.5 kg per minggu
-                
-                **1. Surplus Kalori**
-                - Tambah 300-500 kalori/hari
-                - Fokus pada kalori berkualitas
-                - Makan lebih sering (5-6x/hari)
-                
-                **2. Latihan Kekuatan**
-                - Weight training 3-4x/minggu
-                - Progressive overload
-                - Istirahat cukup antar sesi
-                
-                **3. Nutrisi Optimal**
-                - Protein 1.5-2g/kg berat badan
-                - Karbohidrat kompleks
-                - Lemak sehat (alpukat, kacang)
-                """)
-                
-        else:  # Kesehatan Mental
-            st.markdown("""
-            ### 🧠 Kesehatan Mental & Manajemen Stress
-            
-            #### Teknik Relaksasi
-            1. **Breathing Exercise (4-7-8)**
-               - Tarik napas 4 detik
-               - Tahan 7 detik
-               - Hembuskan 8 detik
-               - Ulangi 3-4x
-            
-            2. **Progressive Muscle Relaxation**
-               - Tegangkan otot 5 detik
-               - Lepaskan dan rasakan relaksasi
-               - Mulai dari kaki hingga kepala
-            
-            #### Mindfulness & Meditasi
-            - Meditasi 10 menit/hari
-            - Journaling untuk self-reflection
-            - Gratitude practice sebelum tidur
-            
-            #### Support System
-            - Berbagi dengan orang terdekat
-            - Konsultasi profesional jika perlu
-            - Join komunitas dengan minat sama
-            """)
-
-    # --- Tab 4: Tentang Proyek ---
+        render_guide_tab()
     with tab4:
-        st.header("ℹ️ Informasi Proyek", divider="rainbow")
-        
-        col1, col2 = st.columns(2)
-        with col1:
-            with st.container():
-                st.markdown("""
-                ### 🎓 Latar Belakang Proyek
-                
-                **Capstone Project Data Science**  
-                Bengkel Koding - Universitas Dian Nuswantoro
-                
-                Proyek ini dikembangkan sebagai solusi berbasis AI untuk membantu 
-                masyarakat dalam memahami dan mengelola risiko obesitas melalui 
-                analisis komprehensif dari berbagai faktor gaya hidup.
-                
-                **Motivasi:**
-                - Meningkatnya prevalensi obesitas global
-                - Kebutuhan akan tools prediksi yang akurat
-                - Edukasi kesehatan yang personalized
-                
-                **Dataset:**
-                - Sumber: 3 negara Amerika Latin
-                - Jumlah data: 2,111 sampel
-                - Features: 17 atribut
-                - Target: NObeyesdad (7 kategori)
-                """)
-                
-                st.markdown("""
-                ### 🔬 Metodologi Penelitian
-                
-                1. **Data Collection & Preparation**
-                   - Dataset dari Mexico, Peru, Colombia
-                   - 77% data sintetis (SMOTE)
-                   - 23% data riil 
-                
-                2. **Exploratory Data Analysis**
-                   - Distribusi data & outlier detection
-                   - Feature correlation analysis
-                   - Pattern identification
-                
-                3. **Feature Engineering**
-                   - BMI calculation
-                   - Age group categorization
-                   - Binary & categorical encoding
-                """)
-                
-        with col2:
-            with st.container():
-                st.markdown("""
-                ### 🤖 Model Development
-                
-                **Algoritma yang Diuji:**
-                - Random Forest ✅ (Terpilih)
-                - Gradient Boosting
-                - Support Vector Machine
-                
-                **Optimasi:**
-                - SMOTE untuk handle imbalance
-                - RandomizedSearchCV untuk hyperparameter tuning
-                - Cross-validation 5-fold
-                
-                **Hasil Akhir:**
-                - Accuracy: 97.56%
-                - F1-Score: 97.55%
-                """)
-                
-                st.markdown("""
-                ### 👨‍💻 Tim Pengembang
-                
-                **Developer:**  
-                Firman Naufal Aryaputra  
-                NIM: A11.2022.14181  
-                Teknik Informatika UDINUS
-                
-                **Pembimbing:**  
-                Tim Dosen Bengkel Koding Data Science
-                
-                **Tech Stack:**
-                - Python
-                - Streamlit for web app
-                - Plotly for visualizations
-                - Joblib for model deployment
-                
-                
-                🔗 **Repository:** [GitHub](https://github.com/Firmanarpp/Capstone_Bengkod_DS01_Firman.git)
-                """)
-        
-        # Project requirements info
-        st.markdown("### 📋 Requirements Project")
-        
-        req_cols = st.columns(3)
-        with req_cols[0]:
-            st.info("""
-            **EDA & Preprocessing**
-            - Missing values handling
-            - Outlier detection
-            - Feature scaling
-            - Class imbalance (SMOTE)
-            """)
-        with req_cols[1]:
-            st.warning("""
-            **Modeling**
-            - Min. 3 algoritma
-            - Model comparison
-            - Hyperparameter tuning
-            - Cross validation
-            """)
-        with req_cols[2]:
-            st.success("""
-            **Deployment**
-            - Streamlit app
-            - GitHub repository
-            - Online deployment
-            - Demo presentation
-            """)
-        
-        # Disclaimer
-        st.warning("""
-        ### ⚠️ Disclaimer Penting
-        
-        Aplikasi ini dikembangkan untuk tujuan edukasi dan penelitian dalam rangka 
-        Capstone Project Bengkel Koding Data Science UDINUS. Hasil prediksi tidak dapat 
-        menggantikan konsultasi dengan profesional kesehatan. Selalu konsultasikan 
-        kondisi kesehatan Anda dengan dokter atau ahli gizi tersertifikasi untuk 
-        mendapatkan diagnosa dan treatment yang tepat.
-        """,)
+        render_about_tab()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
+    observe("script_run", time.perf_counter() - SCRIPT_START)
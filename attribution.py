@@ -0,0 +1,133 @@
+import argparse
+import os
+import sys
+import time
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from forest_engine import CompiledForest, compile_forest
+from metrics import timer
+from preprocessing import build_encoder
+from scoring import DEFAULT_CHUNKSIZE, ENGINES, load_components, score_frame
+
+# Jumlah fitur pendorong teratas yang ditulis per baris pada mode batch
+DEFAULT_TOP_K = 3
+
+
+@lru_cache(maxsize=4)
+def _forest(model):
+    """CompiledForest untuk model (dikompilasi sekali per objek model)"""
+    forest = model if isinstance(model, CompiledForest) else compile_forest(model)
+    if not isinstance(forest, CompiledForest):
+        raise ValueError(
+            f"Atribusi tree-path hanya tersedia untuk Random Forest, bukan {type(model).__name__}"
+        )
+    return forest
+
+
+def feature_contributions(data, components):
+    """
+    Kontribusi setiap fitur ke arah kelas yang diprediksi, untuk list dict atau DataFrame:
+    - Dekomposisi tree-path dari forest (tanpa permutasi atau sampling)
+    - bias + jumlah kontribusi satu baris = probabilitas kelas prediksinya
+    Mengembalikan (probabilities, indeks kelas prediksi, bias kelas prediksi,
+    kontribusi (n_rows, n_features) untuk kelas prediksi).
+    """
+    model, scaler, _, feature_names, _ = components
+    forest = _forest(model)
+    X = build_encoder(scaler, feature_names).transform(data)
+    with timer("attribution"):
+        bias, contributions = forest.contributions(X)
+        probabilities = bias + contributions.sum(axis=1)
+        predicted = probabilities.argmax(axis=1)
+        rows = np.arange(len(predicted))
+        toward = contributions[rows, :, predicted]
+    return probabilities, predicted, bias[predicted], toward
+
+
+def explain_prediction(input_data, components):
+    """
+    Penjelasan satu prediksi:
+    - DataFrame fitur dan kontribusinya, diurutkan dari pengaruh absolut terbesar
+    - Kontribusi positif mendorong ke kelas prediksi, negatif menjauhkan
+    Mengembalikan (bias, DataFrame).
+    """
+    feature_names = components[3]
+    _, _, bias, toward = feature_contributions([input_data], components)
+    explanation = pd.DataFrame({"feature": feature_names, "contribution": toward[0]})
+    order = explanation["contribution"].abs().sort_values(ascending=False).index
+    return float(bias[0]), explanation.loc[order].reset_index(drop=True)
+
+
+def explain_frame(frame, components, top_k=DEFAULT_TOP_K, cache=None):
+    """
+    Memprediksi satu DataFrame (seperti score_frame) dan menambahkan fitur pendorong teratas:
+    - top_feature_i: nama fitur ke-i yang paling mendorong ke kelas prediksi
+    - top_contribution_i: besar kontribusinya (satuan probabilitas)
+    """
+    scored = score_frame(frame, components, cache)
+    feature_names = np.asarray(components[3])
+    _, _, _, toward = feature_contributions(frame, components)
+    top = np.argsort(-toward, axis=1)[:, :top_k]
+    values = np.take_along_axis(toward, top, axis=1)
+    for i in range(top.shape[1]):
+        scored[f"top_feature_{i + 1}"] = feature_names[top[:, i]]
+        scored[f"top_contribution_{i + 1}"] = values[:, i]
+    return scored
+
+
+def explain_csv(source, destination, components, chunksize=DEFAULT_CHUNKSIZE,
+                top_k=DEFAULT_TOP_K, cache=None):
+    """
+    Seperti score_csv, dengan kolom fitur pendorong teratas per baris.
+    Mengembalikan jumlah baris yang diproses.
+    """
+    own_file = isinstance(destination, (str, os.PathLike))
+    handle = open(destination, "w", newline="") if own_file else destination
+    total_rows = 0
+    try:
+        for chunk in pd.read_csv(source, chunksize=chunksize):
+            scored = explain_frame(chunk, components, top_k, cache)
+            scored.to_csv(handle, header=total_rows == 0, index=False)
+            total_rows += len(scored)
+    finally:
+        if own_file:
+            handle.close()
+    return total_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Prediksi batch dengan fitur pendorong teratas per baris (atribusi tree-path)"
+    )
+    parser.add_argument("input", help="File CSV dengan 16 kolom prediktor")
+    parser.add_argument("-o", "--output", required=True, help="File CSV hasil")
+    parser.add_argument("--model-dir", default="deployment_files",
+                        help="Folder komponen model (default: deployment_files)")
+    parser.add_argument("--engine", choices=ENGINES, default="auto",
+                        help="Engine inferensi forest (default: auto)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help="Jumlah baris per chunk")
+    parser.add_argument("--top-k", type=int, default=DEFAULT_TOP_K,
+                        help="Jumlah fitur pendorong per baris")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        components = load_components(args.model_dir, args.engine)
+        total_rows = explain_csv(args.input, args.output, components, args.chunksize, args.top_k)
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {total_rows:,} baris diprediksi dan dijelaskan dalam {elapsed:.2f} detik "
+          f"({elapsed / max(total_rows, 1) * 1000:.3f} ms/baris)")
+    print(f"📁 Hasil tersimpan: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
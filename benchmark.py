@@ -0,0 +1,367 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from preprocessing import RAW_NUMERICAL_COLUMNS, build_encoder, compute_bmi
+from scoring import (
+    DEFAULT_CHUNKSIZE, DICTIONARY_COLUMNS, ENGINES, get_health_scores, iter_record_batches,
+    load_components, record_batch_to_frame, score_csv_parallel, score_file,
+    score_frame,
+)
+
+DEFAULT_BATCH_SIZES = [1, 32, 1_000, 100_000]
+# Target total baris per ukuran batch, agar batch kecil diulang cukup banyak
+TARGET_ROWS = 200_000
+MIN_ITERATIONS = 3
+MAX_ITERATIONS = 500
+DEFAULT_THRESHOLD = 1.2
+
+
+def make_batches(data, batch_size, iterations, seed=42):
+    """Mengambil batch berurutan dari dataset yang diputar ulang (replay)"""
+    rng = np.random.default_rng(seed)
+    start = int(rng.integers(len(data)))
+    batches = []
+    for _ in range(iterations):
+        index = (start + np.arange(batch_size)) % len(data)
+        batches.append(data.iloc[index].reset_index(drop=True))
+        start = int(index[-1] + 1)
+    return batches
+
+
+def build_stages(components):
+    """
+    Tahapan jalur prediksi yang diukur terpisah:
+    - preprocess: FeatureEncoder.transform (preprocess_input)
+    - predict_proba: satu panggilan forest
+    - decode: argmax dan label_encoder.inverse_transform
+    - health_score: BMI dan get_health_scores (vektor)
+    - end_to_end: score_frame lengkap (tanpa cache)
+    Setiap fungsi menerima (batch, state) dan menyimpan hasil antara di state.
+    """
+    model, scaler, label_encoder, feature_names, _ = components
+    encoder = build_encoder(scaler, feature_names)
+
+    def preprocess(batch, state):
+        state["X"] = encoder.transform(batch)
+
+    def predict_proba(batch, state):
+        state["proba"] = model.predict_proba(state["X"])
+
+    def decode(batch, state):
+        encoded = model.classes_[state["proba"].argmax(axis=1)]
+        state["labels"] = label_encoder.inverse_transform(encoded)
+
+    def health_score(batch, state):
+        bmi = compute_bmi(
+            pd.to_numeric(batch["Weight"], errors="coerce"),
+            pd.to_numeric(batch["Height"], errors="coerce"),
+        )
+        state["health"] = get_health_scores(batch, bmi)
+
+    def end_to_end(batch, state):
+        score_frame(batch, components)
+
+    return {
+        "preprocess": preprocess,
+        "predict_proba": predict_proba,
+        "decode": decode,
+        "health_score": health_score,
+        "end_to_end": end_to_end,
+    }
+
+
+def summarize(stage, batch_size, samples, peak_bytes):
+    """Ringkasan persentil latency (ms), throughput, dan puncak memori satu tahap"""
+    samples = np.asarray(samples)
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99]) * 1000
+    return {
+        "batch_size": batch_size,
+        "stage": stage,
+        "iterations": len(samples),
+        "p50_ms": float(p50),
+        "p95_ms": float(p95),
+        "p99_ms": float(p99),
+        "rows_per_sec": float(batch_size / np.median(samples)),
+        "peak_mb": peak_bytes / 1024**2,
+    }
+
+
+def run_benchmark(components, data, batch_sizes=DEFAULT_BATCH_SIZES, target_rows=TARGET_ROWS):
+    """
+    Menjalankan setiap tahap untuk setiap ukuran batch:
+    - Latency diukur tanpa tracemalloc (overhead-nya mengganggu waktu)
+    - Puncak memori diukur pada satu putaran terpisah dengan tracemalloc
+    """
+    stages = build_stages(components)
+    results = []
+    for batch_size in batch_sizes:
+        iterations = int(np.clip(target_rows // batch_size, MIN_ITERATIONS, MAX_ITERATIONS))
+        batches = make_batches(data, batch_size, iterations)
+        samples = {name: [] for name in stages}
+
+        # Pemanasan agar encoder dan cache internal sudah terbentuk
+        warmup = {}
+        for stage_fn in stages.values():
+            stage_fn(batches[0], warmup)
+
+        for batch in batches:
+            state = {}
+            for name, stage_fn in stages.items():
+                start = time.perf_counter()
+                stage_fn(batch, state)
+                samples[name].append(time.perf_counter() - start)
+
+        state = {}
+        for name, stage_fn in stages.items():
+            tracemalloc.start()
+            stage_fn(batches[0], state)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            results.append(summarize(name, batch_size, samples[name], peak))
+    return results
+
+
+def expand_dataset(data, n_rows, seed=42, jitter=0.01):
+    """
+    Ekspansi sintetis dataset untuk uji skala:
+    - Baris diambil acak dengan pengembalian
+    - Kolom numerik diberi jitter relatif kecil agar tidak semua baris terlayani cache
+    """
+    rng = np.random.default_rng(seed)
+    expanded = data.iloc[rng.integers(len(data), size=n_rows)].reset_index(drop=True)
+    for col in RAW_NUMERICAL_COLUMNS:
+        values = pd.to_numeric(expanded[col], errors="coerce").to_numpy(dtype=np.float64)
+        expanded[col] = np.round(values * (1 + rng.normal(0, jitter, n_rows)), 4)
+    return expanded
+
+
+def default_worker_counts():
+    """1, 2, 4, ... hingga jumlah core"""
+    n_cores = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= n_cores:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != n_cores:
+        counts.append(n_cores)
+    return counts
+
+
+def run_scaling(data, model_dir, engine, n_rows, worker_counts, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Mengukur score_csv_parallel pada ekspansi sintetis n_rows baris:
+    - Waktu baca CSV + scoring + tulis hasil per jumlah worker
+    - speedup dan efisiensi relatif terhadap 1 worker
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "synthetic.csv")
+        expand_dataset(data, n_rows).to_csv(source, index=False)
+        for workers in worker_counts:
+            start = time.perf_counter()
+            score_csv_parallel(source, os.path.join(tmp, "scored.csv"), model_dir, engine,
+                               chunksize, workers)
+            elapsed = time.perf_counter() - start
+            results.append({"workers": workers, "rows": n_rows, "seconds": elapsed,
+                            "rows_per_sec": n_rows / elapsed})
+    baseline = results[0]["seconds"] * results[0]["workers"]
+    for row in results:
+        row["speedup"] = baseline / row["seconds"]
+        row["efficiency"] = row["speedup"] / row["workers"]
+    return results
+
+
+def run_format_comparison(components, data, n_rows, chunksize=DEFAULT_CHUNKSIZE):
+    """
+    Membandingkan jalur CSV dengan Parquet/Arrow pada ekspansi sintetis yang sama:
+    - read_seconds: hanya membaca dan mengubah ke DataFrame per chunk
+    - total_seconds: baca + scoring + tulis hasil dalam format yang sama
+    """
+    import pyarrow as pa
+    import pyarrow.feather as feather
+
+    expanded = expand_dataset(data, n_rows)
+    expanded[DICTIONARY_COLUMNS] = expanded[DICTIONARY_COLUMNS].astype("category")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        sources = {
+            fmt: os.path.join(tmp, f"synthetic.{fmt}") for fmt in ["csv", "parquet", "arrow"]
+        }
+        expanded.to_csv(sources["csv"], index=False)
+        expanded.to_parquet(sources["parquet"], index=False)
+        feather.write_feather(pa.Table.from_pandas(expanded, preserve_index=False),
+                              sources["arrow"], compression="uncompressed")
+
+        for fmt, source in sources.items():
+            start = time.perf_counter()
+            if fmt == "csv":
+                for _ in pd.read_csv(source, chunksize=chunksize):
+                    pass
+            else:
+                for batch in iter_record_batches(source, chunksize):
+                    record_batch_to_frame(batch)
+            read_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            score_file(source, os.path.join(tmp, f"scored.{fmt}"), components, chunksize)
+            total_seconds = time.perf_counter() - start
+            results.append({
+                "format": fmt, "rows": n_rows,
+                "file_mb": os.path.getsize(source) / 1024**2,
+                "read_seconds": read_seconds, "total_seconds": total_seconds,
+                "rows_per_sec": n_rows / total_seconds,
+            })
+    return results
+
+
+_APP_PROBE = """
+import json, sys, time, warnings
+warnings.filterwarnings("ignore")
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+sys.path.insert(0, {root!r})
+from metrics import REGISTRY
+import_seconds = time.perf_counter() - start
+
+app = AppTest.from_file({app!r}, default_timeout=300)
+app.run()
+cold = REGISTRY.summary()
+REGISTRY.reset()
+for _ in range({reruns}):
+    app.run()
+warm = REGISTRY.summary()
+print(json.dumps({{
+    "streamlit_import_ms": import_seconds * 1000,
+    "cold_first_form_ms": cold["cold_start_first_form"]["mean_ms"],
+    "cold_script_ms": cold["script_run"]["mean_ms"],
+    "rerun_first_form_ms": warm["script_first_form"]["mean_ms"],
+    "rerun_script_ms": warm["script_run"]["mean_ms"],
+}}))
+"""
+
+
+def measure_app_startup(app_path="app.py", reruns=5):
+    """
+    Cold start dasbor Streamlit pada proses Python baru (AppTest, tanpa browser):
+    - cold_first_form_ms: awal script run pertama sampai form prediksi tampil
+    - cold_script_ms: script run pertama lengkap (termasuk import modul dan load model)
+    - rerun_first_form_ms / rerun_script_ms: rata-rata untuk rerun berikutnya
+    Angka diambil dari metrik script_* yang dicatat app.py sendiri.
+    """
+    root = os.path.dirname(os.path.abspath(__file__))
+    code = _APP_PROBE.format(root=root, app=os.path.abspath(app_path), reruns=max(reruns, 1))
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def environment_info(components, engine):
+    """Info versi untuk membandingkan hasil antar model atau versi preprocessing"""
+    model, _, _, feature_names, metadata = components
+    versions = {"python": platform.python_version(), "numpy": np.__version__,
+                "pandas": pd.__version__}
+    if "sklearn" in sys.modules:
+        versions["scikit-learn"] = sys.modules["sklearn"].__version__
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "engine": engine,
+        "model_type": type(model).__name__,
+        "model_name": metadata.get("nama_model"),
+        "n_features": len(feature_names),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "versions": versions,
+    }
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Membandingkan p50 dua file hasil per (batch_size, stage).
+    Rasio > threshold dianggap regresi.
+    """
+    base = {(row["batch_size"], row["stage"]): row for row in baseline["results"]}
+    rows = []
+    for row in current["results"]:
+        key = (row["batch_size"], row["stage"])
+        if key not in base:
+            continue
+        ratio = row["p50_ms"] / base[key]["p50_ms"] if base[key]["p50_ms"] else float("nan")
+        rows.append({
+            "batch_size": key[0], "stage": key[1],
+            "baseline_p50_ms": base[key]["p50_ms"], "p50_ms": row["p50_ms"],
+            "ratio": ratio, "regression": ratio > threshold,
+        })
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark latency dan throughput jalur prediksi lengkap"
+    )
+    parser.add_argument("--data", default="ObesityDataSet.csv")
+    parser.add_argument("--model-dir", default="deployment_files")
+    parser.add_argument("--engine", choices=ENGINES, default="auto")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--target-rows", type=int, default=TARGET_ROWS,
+                        help="Total baris yang diputar per ukuran batch")
+    parser.add_argument("-o", "--output", default="benchmark_results.json",
+                        help="File JSON hasil benchmark")
+    parser.add_argument("--compare", help="File JSON hasil sebelumnya sebagai baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Rasio p50 maksimum sebelum dianggap regresi")
+    parser.add_argument("--scaling-rows", type=int, default=0,
+                        help="Ukuran ekspansi sintetis untuk uji skala process pool (0 = lewati)")
+    parser.add_argument("--workers", type=int, nargs="+", default=None,
+                        help="Jumlah worker yang diuji (default: 1, 2, 4, ... hingga jumlah core)")
+    parser.add_argument("--format-rows", type=int, default=0,
+                        help="Ukuran ekspansi sintetis untuk perbandingan CSV vs Parquet/Arrow")
+    parser.add_argument("--startup-reruns", type=int, default=0,
+                        help="Ukur cold start dasbor (app.py) dengan sejumlah rerun (0 = lewati)")
+    args = parser.parse_args(argv)
+
+    components = load_components(args.model_dir, args.engine)
+    data = pd.read_csv(args.data)
+    results = run_benchmark(components, data, args.batch_sizes, args.target_rows)
+
+    report = {"environment": environment_info(components, args.engine), "results": results}
+    if args.scaling_rows:
+        report["scaling"] = run_scaling(data, args.model_dir, args.engine, args.scaling_rows,
+                                        args.workers or default_worker_counts())
+    if args.format_rows:
+        report["formats"] = run_format_comparison(components, data, args.format_rows)
+    if args.startup_reruns:
+        report["startup"] = [measure_app_startup("app.py", args.startup_reruns)]
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(pd.DataFrame(results).round(3).to_string(index=False))
+    for section in ["scaling", "formats", "startup"]:
+        if section in report:
+            print(pd.DataFrame(report[section]).round(3).to_string(index=False))
+    print(f"📁 Hasil benchmark tersimpan: {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        comparison = compare_results(baseline, report, args.threshold)
+        print(comparison.round(3).to_string(index=False))
+        if comparison["regression"].any():
+            print(f"❌ Regresi terdeteksi (p50 > {args.threshold:.2f}x baseline)")
+            return 1
+        print("✅ Tidak ada regresi dibanding baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,131 @@
+import argparse
+import os
+
+import joblib
+import numpy as np
+
+CALIBRATION_FILE = "calibration.pkl"
+CALIBRATION_VERSION = 1
+DEFAULT_BINS = 10
+
+
+def fit_calibration(confidence, correct):
+    """
+    Kalibrasi isotonic untuk confidence top-1:
+    - Input: probabilitas kelas prediksi dan apakah prediksi tersebut benar
+    - Hasil: titik-titik (x, y) fungsi monoton confidence -> peluang benar
+    Disimpan sebagai array kecil agar saat serving cukup np.interp (tanpa sklearn).
+    """
+    from sklearn.isotonic import IsotonicRegression
+
+    confidence = np.asarray(confidence, dtype=np.float64)
+    correct = np.asarray(correct, dtype=np.float64)
+    isotonic = IsotonicRegression(y_min=0.0, y_max=1.0, out_of_bounds="clip")
+    isotonic.fit(confidence, correct)
+    return {
+        "version": CALIBRATION_VERSION,
+        "method": "isotonic",
+        "x": np.asarray(isotonic.X_thresholds_, dtype=np.float64),
+        "y": np.asarray(isotonic.y_thresholds_, dtype=np.float64),
+        "n_samples": int(len(confidence)),
+    }
+
+
+def calibrate(confidence, calibration):
+    """Memetakan confidence mentah ke confidence terkalibrasi (vektor, interpolasi linear)"""
+    return np.interp(confidence, calibration["x"], calibration["y"])
+
+
+def expected_calibration_error(confidence, correct, n_bins=DEFAULT_BINS):
+    """ECE: rata-rata selisih |akurasi - confidence| per bin, dibobot jumlah anggota bin"""
+    confidence = np.asarray(confidence, dtype=np.float64)
+    correct = np.asarray(correct, dtype=np.float64)
+    bins = np.minimum((confidence * n_bins).astype(int), n_bins - 1)
+    counts = np.bincount(bins, minlength=n_bins)
+    accuracy = np.bincount(bins, weights=correct, minlength=n_bins)
+    mean_confidence = np.bincount(bins, weights=confidence, minlength=n_bins)
+    filled = counts > 0
+    gaps = np.abs(accuracy[filled] - mean_confidence[filled])
+    return float(gaps.sum() / len(confidence))
+
+
+def crossfit_calibrated(confidence, correct, n_splits=5, seed=42):
+    """
+    Confidence terkalibrasi out-of-fold: setiap baris dipetakan oleh kalibrasi
+    yang di-fit tanpa baris tersebut, untuk estimasi ECE yang jujur
+    """
+    from sklearn.model_selection import KFold
+
+    confidence = np.asarray(confidence, dtype=np.float64)
+    correct = np.asarray(correct, dtype=np.float64)
+    calibrated = np.empty(len(confidence))
+    folds = KFold(n_splits=n_splits, shuffle=True, random_state=seed)
+    for fit_rows, eval_rows in folds.split(confidence):
+        fold = fit_calibration(confidence[fit_rows], correct[fit_rows])
+        calibrated[eval_rows] = calibrate(confidence[eval_rows], fold)
+    return calibrated
+
+
+def calibration_report(confidence, correct, calibrated):
+    """ECE dan Brier score confidence top-1, sebelum dan sesudah kalibrasi"""
+    correct = np.asarray(correct, dtype=np.float64)
+    return {
+        "ece_mentah": expected_calibration_error(confidence, correct),
+        "ece_terkalibrasi": expected_calibration_error(calibrated, correct),
+        "brier_mentah": float(np.mean((np.asarray(confidence) - correct) ** 2)),
+        "brier_terkalibrasi": float(np.mean((calibrated - correct) ** 2)),
+    }
+
+
+def calibration_path(base_dir="deployment_files"):
+    return os.path.join(base_dir, CALIBRATION_FILE)
+
+
+def save_calibration(calibration, base_dir="deployment_files"):
+    joblib.dump(calibration, calibration_path(base_dir))
+    return calibration_path(base_dir)
+
+
+def load_calibration(base_dir="deployment_files"):
+    """Memuat artefak kalibrasi; None jika belum ada"""
+    path = calibration_path(base_dir)
+    if not os.path.exists(path):
+        return None
+    calibration = joblib.load(path)
+    if calibration.get("version") != CALIBRATION_VERSION:
+        raise ValueError(f"Versi kalibrasi tidak didukung: v{calibration.get('version')}")
+    return calibration
+
+
+def main(argv=None):
+    # Import lokal karena scoring mengimpor modul ini
+    import pandas as pd
+
+    from scoring import infer, load_components
+
+    parser = argparse.ArgumentParser(
+        description="Evaluasi kalibrasi confidence pada file CSV berlabel (NObeyesdad)"
+    )
+    parser.add_argument("data", help="CSV berlabel yang tidak dipakai saat training")
+    parser.add_argument("--model-dir", default="deployment_files")
+    args = parser.parse_args(argv)
+
+    components = load_components(args.model_dir)
+    calibration = load_calibration(args.model_dir)
+    if calibration is None:
+        print(f"❌ {CALIBRATION_FILE} tidak ditemukan; jalankan training.py untuk membuatnya")
+        return 1
+
+    data = pd.read_csv(args.data)
+    probabilities, _, labels = infer(data, components)
+    correct = labels == data["NObeyesdad"].to_numpy()
+    confidence = probabilities.max(axis=1)
+    report = calibration_report(confidence, correct, calibrate(confidence, calibration))
+    print(f"✅ {len(data):,} baris, akurasi {correct.mean():.4f}")
+    for key, value in report.items():
+        print(f"   {key:20s} {value:.4f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,221 @@
+import argparse
+import io
+import os
+import time
+import warnings
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+from forest_engine import CompiledForest
+from model_bundle import has_bundle, save_bundle
+from preprocessing import (
+    RAW_COLUMNS, RAW_NUMERICAL_COLUMNS, build_encoder, clean_data, load_dataset,
+)
+from scoring import STUDENT_DIR, load_components
+from training import evaluate, save_artifacts
+
+DATASET_PATH = "ObesityDataSet.csv"
+TARGET_COLUMN = "NObeyesdad"
+RANDOM_STATE = 42
+# Porsi baris asli yang tidak dipakai distilasi, untuk laporan agreement
+EVAL_SIZE = 0.2
+# Sampel sintetis (gaya MUNGE): baris asli dengan sebagian kolom ditukar dan numerik diberi noise
+N_SYNTHETIC = 20_000
+SWAP_PROB = 0.2
+NOISE_SCALE = 0.1
+# Probabilitas guru di bawah ini tidak dijadikan baris target
+MIN_SOFT_WEIGHT = 1e-3
+# Forest murid: sedikit pohon dengan jumlah leaf dibatasi
+STUDENT_PARAMS = {"n_estimators": 10, "max_leaf_nodes": 256}
+
+
+def synthesize_samples(data, n_samples, rng, swap_prob=SWAP_PROB, noise_scale=NOISE_SCALE):
+    """
+    Sampel sintetis di sekitar data asli untuk memperluas transfer set:
+    - Setiap kolom diganti nilai dari baris acak lain dengan peluang swap_prob
+    - Kolom numerik diberi noise Gaussian (noise_scale x std kolom), dibatasi rentang asli
+    """
+    base = data[RAW_COLUMNS].iloc[rng.integers(len(data), size=n_samples)].reset_index(drop=True)
+    donor = data[RAW_COLUMNS].iloc[rng.integers(len(data), size=n_samples)].reset_index(drop=True)
+    synthetic = base.copy()
+    for col in RAW_COLUMNS:
+        swap = rng.random(n_samples) < swap_prob
+        synthetic.loc[swap, col] = donor.loc[swap, col]
+    for col in RAW_NUMERICAL_COLUMNS:
+        noise = rng.normal(0.0, noise_scale * data[col].std(), n_samples)
+        values = synthetic[col].to_numpy(dtype=np.float64) + noise
+        synthetic[col] = values.clip(data[col].min(), data[col].max())
+    return synthetic
+
+
+def soft_target_rows(X, probabilities, classes, min_weight=MIN_SOFT_WEIGHT):
+    """
+    Mengubah label lunak menjadi baris berbobot untuk classifier sklearn:
+    satu baris per (sampel, kelas) dengan bobot = probabilitas guru.
+    Leaf pohon murid lalu berisi rata-rata probabilitas guru, bukan sekadar voting.
+    """
+    rows, columns = np.nonzero(probabilities > min_weight)
+    return X.iloc[rows], np.asarray(classes)[columns], probabilities[rows, columns]
+
+
+def fit_student(X, probabilities, classes, params=None, seed=RANDOM_STATE):
+    """Melatih forest murid pada probabilitas guru"""
+    student = RandomForestClassifier(random_state=seed, **(params or STUDENT_PARAMS))
+    X_rows, y_rows, weights = soft_target_rows(X, probabilities, classes)
+    student.fit(X_rows, y_rows, sample_weight=weights)
+    return student
+
+
+def model_size(model):
+    """Ukuran pickle model (MB) dan jumlah node seluruh pohon"""
+    buffer = io.BytesIO()
+    joblib.dump(model, buffer)
+    n_nodes = sum(estimator.tree_.node_count for estimator in model.estimators_)
+    return buffer.tell() / 1024**2, n_nodes
+
+
+def latency_ms(model, X, n_rows=200, repeats=5):
+    """
+    Latency median lewat CompiledForest, seperti jalur serving:
+    - satu baris (traversal vectorized), median dari n_rows baris
+    - seluruh X sebagai satu batch (diteruskan ke sklearn untuk batch besar)
+    """
+    forest = CompiledForest.from_sklearn(model)
+
+    def median_ms(batches):
+        samples = []
+        for batch in batches:
+            start = time.perf_counter()
+            forest.predict_proba(batch)
+            samples.append(time.perf_counter() - start)
+        return float(np.median(samples)) * 1000
+
+    row_ms = median_ms(X[i:i + 1] for i in range(min(n_rows, len(X))))
+    return row_ms, median_ms([X] * repeats)
+
+
+def agreement_report(teacher, student, X_real, y_real, X_synthetic):
+    """
+    Perbandingan murid terhadap guru:
+    - agreement kelas pada baris asli yang tidak ikut distilasi dan pada sampel sintetis
+    - akurasi keduanya terhadap label asli (guru kemungkinan pernah melihat baris ini)
+    - selisih absolut rata-rata probabilitas, ukuran model, dan latency
+      (satu baris dan batch sampel sintetis)
+    """
+    report = {}
+    for name, X in (("asli", X_real), ("sintetis", X_synthetic)):
+        expected = teacher.predict_proba(X)
+        actual = student.predict_proba(X)
+        report[f"agreement_{name}"] = float(
+            (expected.argmax(axis=1) == actual.argmax(axis=1)).mean()
+        )
+        report[f"selisih_prob_{name}"] = float(np.abs(expected - actual).mean())
+    report["akurasi_guru"] = float((teacher.predict(X_real) == y_real).mean())
+    report["akurasi_murid"] = float((student.predict(X_real) == y_real).mean())
+    for role, model in (("guru", teacher), ("murid", student)):
+        size_mb, n_nodes = model_size(model)
+        report[f"ukuran_{role}_mb"] = size_mb
+        report[f"node_{role}"] = n_nodes
+        report[f"latensi_{role}_ms"], report[f"latensi_batch_{role}_ms"] = latency_ms(
+            model, X_synthetic.to_numpy()
+        )
+    return report
+
+
+def distill(model_dir="deployment_files", data_path=DATASET_PATH, output_dir=None,
+            n_synthetic=N_SYNTHETIC, params=None, seed=RANDOM_STATE):
+    """
+    Pipeline distilasi:
+    - Guru: model di model_dir (engine sklearn)
+    - Transfer set: baris asli (tanpa porsi evaluasi) + sampel sintetis, dilabeli
+      probabilitas guru
+    - Murid disimpan dengan format artefak yang sama (MODEL_FILES dan bundle jika
+      guru memakai bundle) di output_dir, default model_dir/student
+    Mengembalikan metadata murid (laporan agreement ada di metadata["distilasi"]).
+    """
+    output_dir = output_dir or os.path.join(model_dir, STUDENT_DIR)
+    teacher, scaler, label_encoder, feature_names, teacher_metadata = load_components(
+        model_dir, "sklearn"
+    )
+    encoder = build_encoder(scaler, feature_names)
+    rng = np.random.default_rng(seed)
+
+    def encode(data):
+        return pd.DataFrame(encoder.transform(data), columns=list(feature_names))
+
+    data = clean_data(load_dataset(data_path))
+    transfer, holdout = train_test_split(
+        data, test_size=EVAL_SIZE, random_state=seed, stratify=data[TARGET_COLUMN]
+    )
+    X_transfer = encode(pd.concat(
+        [transfer[RAW_COLUMNS], synthesize_samples(transfer, n_synthetic, rng)],
+        ignore_index=True,
+    ))
+    student = fit_student(X_transfer, teacher.predict_proba(X_transfer), teacher.classes_,
+                          params, seed)
+
+    X_holdout = encode(holdout)
+    y_holdout = label_encoder.transform(holdout[TARGET_COLUMN])
+    X_synthetic = encode(synthesize_samples(holdout, max(1, n_synthetic // 4), rng))
+    report = agreement_report(teacher, student, X_holdout, y_holdout, X_synthetic)
+    report.update({"jumlah_baris_asli": len(transfer), "jumlah_sintetis": n_synthetic})
+
+    metadata = {
+        "nama_model": f"{teacher_metadata.get('nama_model', 'Random Forest')} (murid distilasi)",
+        "tipe_model": type(student).__name__,
+        **evaluate(student, X_holdout, y_holdout),
+        "parameter_terbaik": dict(params or STUDENT_PARAMS),
+        "jumlah_fitur": len(feature_names),
+        "kelas_target": list(label_encoder.classes_),
+        "fitur_numerik": teacher_metadata.get("fitur_numerik"),
+        "guru": teacher_metadata.get("nama_model"),
+        "distilasi": report,
+    }
+    save_artifacts(output_dir, student, scaler, label_encoder, feature_names, metadata)
+    # Ikuti format guru: bundle dibuat jika guru juga memakai bundle
+    if has_bundle(model_dir) and not has_bundle(output_dir):
+        save_bundle((student, scaler, label_encoder, list(feature_names), metadata), output_dir)
+    return metadata
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Distilasi forest final menjadi model murid yang ringkas"
+    )
+    parser.add_argument("--model-dir", default="deployment_files",
+                        help="Folder model guru (default: deployment_files)")
+    parser.add_argument("--data", default=DATASET_PATH)
+    parser.add_argument("--output-dir", help="Folder murid (default: <model-dir>/student)")
+    parser.add_argument("--n-synthetic", type=int, default=N_SYNTHETIC,
+                        help="Jumlah sampel sintetis pada transfer set")
+    parser.add_argument("--n-estimators", type=int, default=STUDENT_PARAMS["n_estimators"])
+    parser.add_argument("--max-leaf-nodes", type=int, default=STUDENT_PARAMS["max_leaf_nodes"])
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore")
+    params = {"n_estimators": args.n_estimators, "max_leaf_nodes": args.max_leaf_nodes}
+    output_dir = args.output_dir or os.path.join(args.model_dir, STUDENT_DIR)
+    start = time.perf_counter()
+    metadata = distill(args.model_dir, args.data, output_dir, args.n_synthetic, params)
+    report = metadata["distilasi"]
+
+    print(f"✅ Murid dilatih dalam {time.perf_counter() - start:.1f} detik "
+          f"({report['jumlah_baris_asli']:,} baris asli + {report['jumlah_sintetis']:,} sintetis)")
+    print(f"🤝 Agreement dengan guru: {report['agreement_asli']:.2%} (baris asli), "
+          f"{report['agreement_sintetis']:.2%} (sintetis)")
+    print(f"🎯 Akurasi: guru {report['akurasi_guru']:.4f}, murid {report['akurasi_murid']:.4f}")
+    for role in ("guru", "murid"):
+        print(f"   {role:5s} {report[f'node_{role}']:>8,} node  "
+              f"{report[f'ukuran_{role}_mb']:7.2f} MB  "
+              f"{report[f'latensi_{role}_ms']:.3f} ms/baris  "
+              f"{report[f'latensi_batch_{role}_ms']:.1f} ms/batch")
+    print(f"📁 Artefak murid tersimpan di: {output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
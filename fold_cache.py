@@ -0,0 +1,198 @@
+import argparse
+import json
+import os
+import time
+import warnings
+
+import joblib
+import numpy as np
+from imblearn.over_sampling import SMOTE
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
+from sklearn.preprocessing import StandardScaler
+
+from preprocessing import NUMERICAL_FEATURES
+
+RANDOM_STATE = 42
+CACHE_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+FOLD_ARRAYS = ["X_train", "y_train", "X_valid", "y_valid"]
+DEFAULT_N_SPLITS = 5
+# Grid benchmark pencarian: model murah sehingga SMOTE dan scaling per fold dominan
+BENCHMARK_MODEL = "K-Nearest Neighbors"
+BENCHMARK_GRID = {"n_neighbors": list(range(1, 21)), "weights": ["uniform", "distance"]}
+
+
+def resample_fold(X_train, y_train, X_valid, seed=RANDOM_STATE):
+    """
+    Preprocessing satu fold tanpa kebocoran ke data validasi:
+    - SMOTE hanya pada baris latih fold
+    - StandardScaler (kolom NUMERICAL_FEATURES) di-fit pada hasil SMOTE
+    Mengembalikan array (X_train, y_train, X_valid) siap dipakai model.
+    """
+    X_resampled, y_resampled = SMOTE(random_state=seed).fit_resample(X_train, y_train)
+    X_valid = X_valid.copy()
+    numerical = [col for col in NUMERICAL_FEATURES if col in X_resampled.columns]
+    scaler = StandardScaler()
+    X_resampled[numerical] = scaler.fit_transform(X_resampled[numerical])
+    X_valid[numerical] = scaler.transform(X_valid[numerical])
+    return (X_resampled.to_numpy(dtype=np.float64), np.asarray(y_resampled),
+            X_valid.to_numpy(dtype=np.float64))
+
+
+def _fit_score(model, X_train, y_train, X_valid, y_valid):
+    warnings.filterwarnings("ignore")
+    return model.fit(X_train, y_train).score(X_valid, y_valid)
+
+
+class FoldCache:
+    """
+    Matriks CV per fold yang sudah di-SMOTE dan di-scale, dihitung sekali lalu disimpan:
+    - fold_<k>_<nama>.npy dibaca dengan mmap_mode="r", sehingga semua model kandidat,
+      trial hyperparameter, dan proses worker berbagi page cache yang sama
+    - manifest.json menyimpan fingerprint data; cache dibangun ulang jika data berubah
+    Fold dibentuk dari baris asli (StratifiedKFold tanpa shuffle) dan validasi tidak
+    pernah berisi sampel sintetis. reused menandai cache yang dimuat tanpa dihitung ulang.
+    """
+
+    def __init__(self, directory, n_splits, fingerprint, train_sizes, reused=False):
+        self.directory = directory
+        self.n_splits = n_splits
+        self.fingerprint = fingerprint
+        self.train_sizes = train_sizes
+        self.reused = reused
+        self._folds = {}
+
+    @classmethod
+    def build(cls, directory, X, y, n_splits=DEFAULT_N_SPLITS, seed=RANDOM_STATE,
+              rebuild=False):
+        """Memuat cache jika fingerprint cocok (kecuali rebuild); selain itu menghitung ulang"""
+        y = np.asarray(y)
+        fingerprint = joblib.hash((X, y, n_splits, seed, CACHE_VERSION))
+        manifest_path = os.path.join(directory, MANIFEST_FILE)
+        if os.path.exists(manifest_path) and not rebuild:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get("fingerprint") == fingerprint:
+                return cls(directory, n_splits, fingerprint, manifest["train_sizes"], reused=True)
+
+        os.makedirs(directory, exist_ok=True)
+        # Manifest lama dihapus sebelum fold ditimpa: build yang terhenti tidak boleh
+        # menyisakan manifest valid di atas campuran fold lama dan baru
+        if os.path.exists(manifest_path):
+            os.remove(manifest_path)
+        train_sizes = []
+        folds = StratifiedKFold(n_splits=n_splits).split(X, y)
+        for k, (train, valid) in enumerate(folds):
+            X_train, y_train, X_valid = resample_fold(X.iloc[train], y[train], X.iloc[valid], seed)
+            arrays = {"X_train": X_train, "y_train": y_train,
+                      "X_valid": X_valid, "y_valid": y[valid]}
+            for name in FOLD_ARRAYS:
+                np.save(os.path.join(directory, f"fold_{k}_{name}.npy"), arrays[name])
+            train_sizes.append(len(y_train))
+        # Manifest ditulis terakhir: cache yang terhenti di tengah jalan tidak dianggap valid
+        with open(manifest_path, "w") as f:
+            json.dump({"version": CACHE_VERSION, "fingerprint": fingerprint,
+                       "n_splits": n_splits, "columns": list(X.columns),
+                       "train_sizes": train_sizes}, f, indent=2)
+        return cls(directory, n_splits, fingerprint, train_sizes)
+
+    def fold(self, k):
+        """(X_train, y_train, X_valid, y_valid) fold ke-k sebagai memory-map read-only"""
+        if k not in self._folds:
+            self._folds[k] = tuple(
+                np.load(os.path.join(self.directory, f"fold_{k}_{name}.npy"), mmap_mode="r")
+                for name in FOLD_ARRAYS
+            )
+        return self._folds[k]
+
+    def cross_validate(self, model, n_jobs=None):
+        """Akurasi setiap fold untuk satu model (seperti cross_val_score, tanpa preprocessing)"""
+        return np.array(Parallel(n_jobs=n_jobs)(
+            delayed(_fit_score)(clone(model), *self.fold(k)) for k in range(self.n_splits)
+        ))
+
+
+def cross_validate_uncached(model, X, y, n_splits=DEFAULT_N_SPLITS, seed=RANDOM_STATE):
+    """Pembanding: SMOTE dan scaling dihitung ulang di setiap fold untuk setiap model"""
+    y = np.asarray(y)
+    scores = []
+    for train, valid in StratifiedKFold(n_splits=n_splits).split(X, y):
+        X_train, y_train, X_valid = resample_fold(X.iloc[train], y[train], X.iloc[valid], seed)
+        scores.append(_fit_score(clone(model), X_train, y_train, X_valid, y[valid]))
+    return np.array(scores)
+
+
+def timed(function, *args, **kwargs):
+    """(hasil, durasi detik) satu pemanggilan"""
+    start = time.perf_counter()
+    result = function(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def benchmark_search(model, grid, X, y, cache):
+    """
+    Pencarian grid dengan banyak trial (kandidat x fold), berurutan dalam satu proses:
+    - tanpa cache: SMOTE dan scaling dihitung ulang untuk setiap trial
+    - dengan cache: setiap trial membaca fold dari cache
+    Mengembalikan (jumlah trial, detik tanpa cache, detik dengan cache, skor sama).
+    """
+    candidates = [clone(model).set_params(**params) for params in ParameterGrid(grid)]
+    uncached, uncached_seconds = timed(
+        lambda: [cross_validate_uncached(candidate, X, y) for candidate in candidates]
+    )
+    cached, cached_seconds = timed(
+        lambda: [cache.cross_validate(candidate) for candidate in candidates]
+    )
+    same = all(np.allclose(a, b) for a, b in zip(uncached, cached))
+    return len(candidates) * cache.n_splits, uncached_seconds, cached_seconds, same
+
+
+def main(argv=None):
+    # Import lokal karena training mengimpor modul ini
+    from training import build_models, prepare_training_data
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark CV dengan dan tanpa cache fold (tujuh model dan satu pencarian)"
+    )
+    parser.add_argument("--data", default="ObesityDataSet.csv")
+    parser.add_argument("--cache-dir", default=".fold_cache")
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore")
+    *_, (X_real, y_real) = prepare_training_data(args.data, [])
+    models = build_models(1)
+
+    # Build dipaksa agar durasinya terukur, lalu build kedua mengukur pemakaian ulang
+    _, build_seconds = timed(FoldCache.build, args.cache_dir, X_real, y_real, rebuild=True)
+    cache, reuse_seconds = timed(FoldCache.build, args.cache_dir, X_real, y_real)
+    print(f"📁 Cache fold di {args.cache_dir}: dibangun {build_seconds:.2f} s, "
+          f"dipakai ulang {reuse_seconds:.3f} s (reused={cache.reused})")
+
+    uncached, uncached_seconds = timed(
+        lambda: {name: cross_validate_uncached(model, X_real, y_real)
+                 for name, model in models.items()}
+    )
+    cached, cached_seconds = timed(
+        lambda: {name: cache.cross_validate(model) for name, model in models.items()}
+    )
+    for name in models:
+        same = "✅" if np.allclose(uncached[name], cached[name]) else "❌"
+        print(f"   {same} {name:22s} CV {cached[name].mean():.4f}")
+    print(f"⏱️ {len(models)} model ({len(models) * cache.n_splits} fit): tanpa cache "
+          f"{uncached_seconds:.2f} s, dengan cache {cached_seconds:.2f} s "
+          f"(speedup {uncached_seconds / cached_seconds:.2f}x, tanpa waktu build)")
+
+    n_trials, uncached_seconds, cached_seconds, same = benchmark_search(
+        models[BENCHMARK_MODEL], BENCHMARK_GRID, X_real, y_real, cache
+    )
+    print(f"⏱️ Pencarian {BENCHMARK_MODEL} ({n_trials} trial): tanpa cache "
+          f"{uncached_seconds:.2f} s, dengan cache {cached_seconds:.2f} s "
+          f"(speedup {uncached_seconds / cached_seconds:.2f}x, "
+          f"{'skor sama' if same else 'skor berbeda'})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,352 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+# Jumlah maksimum node yang ditelusuri bersamaan (baris x pohon) per blok
+BLOCK_NODES = 1 << 19
+# Di atas ukuran batch ini traversal Cython milik sklearn lebih cepat
+FALLBACK_MIN_ROWS = 256
+# Jumlah pohon yang dievaluasi per langkah pada mode anytime (early exit)
+DEFAULT_TREE_CHUNK = 10
+
+
+class CompiledForest:
+    """
+    RandomForestClassifier yang dikompilasi menjadi array NumPy datar:
+    - feature, threshold, children, dan value untuk semua pohon digabung
+    - children[2 * node + 1] adalah anak kiri, children[2 * node] anak kanan
+    - Antarmuka predict_proba dan classes_ sama dengan model sklearn
+    - Batch besar diteruskan ke model sklearn asli (fallback) jika tersedia;
+      fallback_loader memungkinkan model tersebut baru dimuat saat pertama dibutuhkan
+    - early_exit (opsional): tingkat agreement mode anytime untuk semua ukuran batch
+      (menggantikan fallback), lihat predict_proba_anytime
+    """
+
+    def __init__(self, feature, threshold, children, value, roots, max_depth, classes,
+                 fallback=None, fallback_loader=None):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.max_depth = int(max_depth)
+        self.classes_ = classes
+        self.fallback = fallback
+        self.fallback_loader = fallback_loader
+        self.n_estimators = len(roots)
+        self.early_exit = None
+        self.is_leaf = children[0::2] == np.arange(len(feature))
+
+    @classmethod
+    def from_sklearn(cls, model):
+        """Mengekspor semua pohon dari RandomForestClassifier yang sudah di-fit"""
+        features, thresholds, children, values, roots = [], [], [], [], []
+        offset, max_depth = 0, 0
+        for estimator in model.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            # Leaf menunjuk ke dirinya sendiri
+            pairs = np.empty(2 * n_nodes, dtype=np.int64)
+            pairs[0::2] = np.where(is_leaf, node_ids, tree.children_right) + offset
+            pairs[1::2] = np.where(is_leaf, node_ids, tree.children_left) + offset
+            children.append(pairs)
+
+            # Normalisasi isi leaf menjadi probabilitas kelas per pohon
+            value = tree.value[:, 0, :]
+            values.append(value / value.sum(axis=1, keepdims=True))
+
+            roots.append(offset)
+            offset += n_nodes
+            max_depth = max(max_depth, tree.max_depth)
+
+        return cls(
+            feature=np.ascontiguousarray(np.concatenate(features), dtype=np.int32),
+            threshold=np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float64),
+            children=np.ascontiguousarray(np.concatenate(children), dtype=np.int32),
+            value=np.ascontiguousarray(np.concatenate(values), dtype=np.float64),
+            roots=np.asarray(roots, dtype=np.int32),
+            max_depth=max_depth,
+            classes=np.asarray(model.classes_),
+            fallback=model,
+        )
+
+    def load_fallback(self):
+        """Memuat model sklearn fallback sekarang (misalnya sebelum fork proses worker)"""
+        if self.fallback is None and self.fallback_loader is not None:
+            self.fallback = self.fallback_loader()
+        return self.fallback
+
+    def apply(self, X, roots=None):
+        """
+        Mengembalikan indeks leaf global dengan bentuk (n_rows, n_trees).
+        Pasangan (baris, pohon) yang sudah mencapai leaf dikeluarkan dari set aktif.
+        roots membatasi traversal pada sebagian pohon (default: semua pohon).
+        """
+        roots = self.roots if roots is None else roots
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_cols = X.shape
+        flat_X = X.ravel()
+        row_offset = np.repeat(np.arange(n_rows, dtype=np.int64) * n_cols, len(roots))
+        nodes = np.tile(roots, n_rows)
+        leaves = nodes.copy()
+        position = np.arange(len(nodes))
+        while len(nodes):
+            go_left = flat_X[row_offset + self.feature[nodes]] <= self.threshold[nodes]
+            nodes = self.children[2 * nodes + go_left]
+            done = self.is_leaf[nodes]
+            if done.any():
+                leaves[position[done]] = nodes[done]
+                active = ~done
+                nodes, position, row_offset = nodes[active], position[active], row_offset[active]
+        return leaves.reshape(n_rows, len(roots))
+
+    def predict_proba(self, X, use_fallback=True, anytime=True):
+        """
+        Rata-rata probabilitas leaf seluruh pohon, diproses per blok baris.
+        Jika early_exit aktif (dan anytime=True), hasilnya dari mode anytime:
+        rata-rata pohon yang sudah dievaluasi saja.
+        """
+        n_rows = X.shape[0]
+        if anytime and self.early_exit is not None:
+            return self.predict_proba_anytime(X, self.early_exit)[0]
+        if use_fallback and n_rows >= FALLBACK_MIN_ROWS:
+            if self.load_fallback() is not None:
+                return self.fallback.predict_proba(X)
+        X = np.asarray(X, dtype=np.float32)
+        block = max(1, BLOCK_NODES // self.n_estimators)
+        probabilities = np.empty((n_rows, self.value.shape[1]), dtype=np.float64)
+        for start in range(0, n_rows, block):
+            leaves = self.apply(X[start:start + block])
+            probabilities[start:start + block] = self.value[leaves].mean(axis=1)
+        return probabilities
+
+    def predict(self, X):
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def predict_proba_anytime(self, X, agreement=1.0, chunk=DEFAULT_TREE_CHUNK):
+        """
+        Mode anytime: pohon dievaluasi per kelompok berurutan, dan baris yang sudah
+        pasti kelasnya berhenti lebih awal.
+        - agreement=1.0: berhenti hanya jika sisa pohon tidak mungkin membalik kelas
+          teratas, sehingga kelas dijamin sama dengan forest penuh
+        - agreement<1.0: berhenti jika batas Hoeffding atas sisa pohon memberi peluang
+          terbalik di bawah 1 - agreement. Batas ini berlaku jika sisa pohon rata-rata
+          tidak memihak kelas kedua (pohon dianggap exchangeable); jadi tingkat agreement
+          adalah target, bukan jaminan per baris
+        Probabilitas adalah rata-rata pohon yang sudah dievaluasi (confidence terpotong,
+        bukan confidence forest penuh).
+        Mengembalikan (probabilities, jumlah pohon yang dievaluasi per baris).
+        """
+        if not 0.0 < agreement <= 1.0:
+            raise ValueError(f"agreement harus di antara 0 dan 1, bukan {agreement}")
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows = X.shape[0]
+        totals = np.zeros((n_rows, self.value.shape[1]), dtype=np.float64)
+        evaluated = np.zeros(n_rows, dtype=np.int64)
+        block = max(1, BLOCK_NODES // self.n_estimators)
+        for start in range(0, n_rows, block):
+            rows = slice(start, start + block)
+            totals[rows], evaluated[rows] = self._anytime_block(X[rows], agreement, chunk)
+        return totals / evaluated[:, None], evaluated
+
+    def _anytime_block(self, X, agreement, chunk):
+        """Akumulasi value leaf per kelompok pohon; baris yang sudah diputuskan dikeluarkan"""
+        totals = np.zeros((len(X), self.value.shape[1]), dtype=np.float64)
+        evaluated = np.zeros(len(X), dtype=np.int64)
+        active = np.arange(len(X))
+        # Dengan jaminan penuh, keputusan paling cepat terjadi setelah lebih dari separuh pohon
+        step = self.n_estimators // 2 + 1 if agreement >= 1.0 else chunk
+        start = 0
+        while len(active) and start < self.n_estimators:
+            stop = min(start + step, self.n_estimators)
+            leaves = self.apply(X[active], self.roots[start:stop])
+            totals[active] += self.value[leaves].sum(axis=1)
+            evaluated[active] = stop
+            active = active[~self._decided(totals[active], stop, agreement)]
+            start, step = stop, chunk
+        return totals, evaluated
+
+    def _decided(self, totals, evaluated, agreement):
+        """Apakah kelas teratas setiap baris sudah tidak akan berubah oleh sisa pohon"""
+        top_two = np.partition(totals, -2, axis=1)[:, -2:]
+        lead = top_two[:, 1] - top_two[:, 0]
+        remaining = self.n_estimators - evaluated
+        # Setiap pohon menambah paling banyak 1 ke selisih dua kelas
+        if agreement >= 1.0:
+            return lead > remaining
+        # Hoeffding atas jumlah sisa selisih (tiap pohon dalam [-1, 1]):
+        # P(sisa pohon mengurangi selisih sebesar lead) <= exp(-lead^2 / (2 * remaining))
+        return lead**2 >= 2 * remaining * np.log(1 / (1 - agreement))
+
+    def contributions(self, X):
+        """
+        Dekomposisi tree-path: probabilitas = bias + jumlah kontribusi fitur.
+        - Setiap split menyumbang value[anak] - value[node] ke fitur yang dipakai node
+        - bias adalah rata-rata value root seluruh pohon
+        Mengembalikan (bias (n_classes,), kontribusi (n_rows, n_features, n_classes)).
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_rows, n_cols = X.shape
+        bias = self.value[self.roots].mean(axis=0)
+        contributions = np.empty((n_rows, n_cols, self.value.shape[1]), dtype=np.float64)
+        block = max(1, BLOCK_NODES // self.n_estimators)
+        for start in range(0, n_rows, block):
+            rows = X[start:start + block]
+            contributions[start:start + len(rows)] = self._path_contributions(rows)
+        return bias, contributions
+
+    def _path_contributions(self, X):
+        """Traversal seperti apply(), sambil menjumlahkan perubahan value per (baris, fitur)"""
+        n_rows, n_cols = X.shape
+        n_classes = self.value.shape[1]
+        flat_X = X.ravel()
+        row_offset = np.repeat(np.arange(n_rows, dtype=np.int64) * n_cols, self.n_estimators)
+        nodes = np.tile(self.roots, n_rows)
+        # Satu slot per sel X: indeks baris * n_cols + fitur
+        totals = np.zeros((n_classes, n_rows * n_cols), dtype=np.float64)
+        while len(nodes):
+            slots = row_offset + self.feature[nodes]
+            go_left = flat_X[slots] <= self.threshold[nodes]
+            children = self.children[2 * nodes + go_left]
+            delta = self.value[children] - self.value[nodes]
+            for k in range(n_classes):
+                totals[k] += np.bincount(slots, weights=delta[:, k], minlength=n_rows * n_cols)
+            active = ~self.is_leaf[children]
+            nodes, row_offset = children[active], row_offset[active]
+        return totals.T.reshape(n_rows, n_cols, n_classes) / self.n_estimators
+
+
+def compile_forest(model):
+    """Membungkus model sklearn menjadi CompiledForest (model lain dikembalikan apa adanya)"""
+    if hasattr(model, "estimators_") and all(
+        hasattr(estimator, "tree_") for estimator in model.estimators_
+    ):
+        return CompiledForest.from_sklearn(model)
+    return model
+
+
+def check_parity(model, compiled, X, atol=1e-9):
+    """
+    Membandingkan CompiledForest dengan predict_proba sklearn:
+    - Selisih absolut maksimum probabilitas
+    - Persentase kesamaan kelas hasil argmax
+    """
+    expected = model.predict_proba(X)
+    actual = compiled.predict_proba(X, use_fallback=False)
+    max_diff = float(np.abs(expected - actual).max())
+    agreement = float((expected.argmax(axis=1) == actual.argmax(axis=1)).mean())
+    return {"max_abs_diff": max_diff, "class_agreement": agreement, "passed": max_diff <= atol}
+
+
+def benchmark(model, compiled, X, batch_sizes=(1, 10, 100, 1_000, 10_000, 100_000),
+              repeats=5):
+    """
+    Mengukur latency median untuk tiap ukuran batch:
+    - sklearn: predict_proba model asli
+    - vectorized: traversal NumPy murni (tanpa fallback)
+    - compiled: mode default (vectorized untuk batch kecil, sklearn untuk batch besar)
+    """
+    engines = {
+        "sklearn": model.predict_proba,
+        "vectorized": lambda batch: compiled.predict_proba(batch, use_fallback=False),
+        "compiled": compiled.predict_proba,
+    }
+    rows = []
+    for batch_size in batch_sizes:
+        batch = X[np.arange(batch_size) % len(X)]
+        n_repeats = repeats if batch_size <= 10_000 else 1
+        timings = {}
+        for name, engine in engines.items():
+            samples = []
+            for _ in range(n_repeats):
+                start = time.perf_counter()
+                engine(batch)
+                samples.append(time.perf_counter() - start)
+            timings[f"{name}_ms"] = float(np.median(samples)) * 1000
+        rows.append({
+            "batch_size": batch_size,
+            **timings,
+            "speedup": timings["sklearn_ms"] / timings["compiled_ms"],
+        })
+    return pd.DataFrame(rows)
+
+
+def benchmark_early_exit(compiled, X, agreements=(1.0, 0.999, 0.99),
+                         batch_sizes=(1, 100, None), repeats=5):
+    """
+    Mengukur mode anytime terhadap forest penuh (traversal vectorized tanpa fallback):
+    - mean_trees: rata-rata pohon yang dievaluasi per baris
+    - class_agreement: kesamaan kelas dengan forest penuh
+    - full_ms, anytime_ms, saved: latency median per batch dan porsi yang dihemat
+    batch_size None = seluruh X.
+    """
+    full = compiled.predict_proba(X, use_fallback=False).argmax(axis=1)
+
+    def median_ms(engine, batch):
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            engine(batch)
+            samples.append(time.perf_counter() - start)
+        return float(np.median(samples)) * 1000
+
+    rows = []
+    for agreement in agreements:
+        probabilities, n_trees = compiled.predict_proba_anytime(X, agreement)
+        for batch_size in batch_sizes:
+            batch = X if batch_size is None else X[np.arange(batch_size) % len(X)]
+            full_ms = median_ms(lambda b: compiled.predict_proba(b, use_fallback=False), batch)
+            anytime_ms = median_ms(lambda b: compiled.predict_proba_anytime(b, agreement), batch)
+            rows.append({
+                "agreement": agreement,
+                "batch_size": len(batch),
+                "mean_trees": float(n_trees.mean()),
+                "class_agreement": float((probabilities.argmax(axis=1) == full).mean()),
+                "full_ms": full_ms,
+                "anytime_ms": anytime_ms,
+                "saved": 1 - anytime_ms / full_ms,
+            })
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    # Import lokal karena scoring juga mengimpor modul ini
+    from preprocessing import preprocess_input
+    from scoring import load_components
+
+    parser = argparse.ArgumentParser(
+        description="Uji kesamaan dan benchmark CompiledForest terhadap sklearn"
+    )
+    parser.add_argument("--model-dir", default="deployment_files")
+    parser.add_argument("--data", default="ObesityDataSet.csv")
+    parser.add_argument("--skip-benchmark", action="store_true")
+    parser.add_argument("--early-exit", action="store_true",
+                        help="Benchmark mode anytime (early exit) untuk beberapa tingkat agreement")
+    args = parser.parse_args(argv)
+
+    model, scaler, _, feature_names, _ = load_components(args.model_dir, "sklearn")
+    X = preprocess_input(pd.read_csv(args.data), scaler, feature_names)
+    compiled = CompiledForest.from_sklearn(model)
+
+    parity = check_parity(model, compiled, X)
+    status = "✅" if parity["passed"] else "❌"
+    print(f"{status} Parity pada {len(X):,} baris: selisih maks {parity['max_abs_diff']:.2e}, "
+          f"kesamaan kelas {parity['class_agreement']:.2%}")
+
+    if not args.skip_benchmark:
+        print(benchmark(model, compiled, X).round(3).to_string(index=False))
+    if args.early_exit:
+        print(f"⏱️ Early exit ({compiled.n_estimators} pohon):")
+        print(benchmark_early_exit(compiled, X).round(4).to_string(index=False))
+    return 0 if parity["passed"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
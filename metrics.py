@@ -0,0 +1,147 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRIC_NAME = "obesity_stage_duration_seconds"
+# Batas bucket histogram (detik), mengikuti skala bucket default Prometheus
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class LatencyHistogram:
+    """
+    Histogram kumulatif ala Prometheus untuk satu tahap:
+    - counts[i]: jumlah observasi <= buckets[i] (bucket terakhir = +Inf)
+    - sum dan count untuk menghitung rata-rata
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        """Perkiraan kuantil: batas atas bucket tempat kuantil berada"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            running += count
+            if running >= target:
+                return bound
+        return float("inf")
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.sum / self.count * 1000 if self.count else 0.0,
+            "p50_ms": self.quantile(0.5) * 1000,
+            "p95_ms": self.quantile(0.95) * 1000,
+        }
+
+
+class MetricsRegistry:
+    """Kumpulan histogram per tahap yang aman dipakai banyak thread"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = LatencyHistogram(self.buckets)
+            histogram.observe(seconds)
+
+    def count(self, stage):
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            return histogram.count if histogram is not None else 0
+
+    @contextmanager
+    def timer(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def summary(self):
+        """Ringkasan per tahap (count, rata-rata, perkiraan p50/p95) dalam ms"""
+        with self._lock:
+            return {stage: hist.summary() for stage, hist in sorted(self._histograms.items())}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def render_prometheus(self):
+        """Format teks eksposisi Prometheus untuk di-scrape"""
+        lines = [
+            f"# HELP {METRIC_NAME} Durasi tiap tahap jalur prediksi",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        with self._lock:
+            for stage, hist in sorted(self._histograms.items()):
+                running = 0
+                for bound, count in zip(hist.buckets + (float("inf"),), hist.counts):
+                    running += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{METRIC_NAME}_bucket{{stage="{stage}",le="{le}"}} {running}')
+                lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {hist.sum!r}')
+                lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {hist.count}')
+        return "\n".join(lines) + "\n"
+
+
+# Registry global untuk proses ini (dashboard, API, dan CLI)
+REGISTRY = MetricsRegistry()
+
+
+def timer(stage):
+    """Context manager pengukur durasi satu tahap ke REGISTRY"""
+    return REGISTRY.timer(stage)
+
+
+def observe(stage, seconds):
+    REGISTRY.observe(stage, seconds)
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """Endpoint GET /metrics untuk Prometheus"""
+
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path != "/metrics":
+            self.send_error(404)
+            return
+        body = self.registry.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", PROMETHEUS_CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port, host="0.0.0.0", registry=REGISTRY):
+    """Menjalankan server /metrics di thread daemon (untuk proses Streamlit)"""
+    handler = type("Handler", (MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,212 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from forest_engine import CompiledForest
+
+BUNDLE_DIR = "model_bundle"
+BUNDLE_FORMAT = "obesity-model-bundle"
+BUNDLE_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+ESTIMATOR_FILE = "estimator.joblib"
+FOREST_ARRAYS = ["feature", "threshold", "children", "value", "roots", "classes"]
+
+
+class BundleScaler:
+    """Pengganti ringan StandardScaler (hanya parameter yang dipakai saat inferensi)"""
+
+    def __init__(self, feature_names_in, mean, scale):
+        self.feature_names_in_ = np.asarray(feature_names_in, dtype=object)
+        self.mean_ = np.asarray(mean, dtype=np.float64)
+        self.scale_ = np.asarray(scale, dtype=np.float64)
+        self.n_features_in_ = len(self.mean_)
+
+    def transform(self, X):
+        return (np.asarray(X, dtype=np.float64) - self.mean_) / self.scale_
+
+
+class BundleLabelEncoder:
+    """Pengganti ringan LabelEncoder untuk decoding label kelas"""
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes, dtype=object)
+
+    def transform(self, labels):
+        lookup = {label: i for i, label in enumerate(self.classes_)}
+        return np.array([lookup[label] for label in labels], dtype=np.int64)
+
+    def inverse_transform(self, codes):
+        return self.classes_[np.asarray(codes, dtype=np.int64)]
+
+
+def bundle_path(base_dir="deployment_files"):
+    return os.path.join(base_dir, BUNDLE_DIR)
+
+
+def has_bundle(base_dir="deployment_files"):
+    return os.path.exists(os.path.join(bundle_path(base_dir), MANIFEST_FILE))
+
+
+def supports_bundle(model):
+    """Bundle hanya untuk RandomForestClassifier (array forest untuk CompiledForest)"""
+    from sklearn.ensemble import RandomForestClassifier
+
+    return isinstance(model, RandomForestClassifier)
+
+
+def remove_bundle(base_dir="deployment_files"):
+    """Menghapus bundle agar engine "auto" tidak memuat model lama"""
+    shutil.rmtree(bundle_path(base_dir), ignore_errors=True)
+
+
+def save_bundle(components, base_dir="deployment_files"):
+    """
+    Menyimpan semua komponen model menjadi satu bundle berversi:
+    - manifest.json: feature names, metadata, parameter scaler, kelas label
+    - *.npy: array forest (tanpa kompresi agar bisa di-memory-map)
+    - estimator.joblib: model sklearn terkompresi untuk batch besar
+    """
+    import joblib
+
+    model, scaler, label_encoder, feature_names, metadata = components
+    if not supports_bundle(model):
+        raise ValueError(
+            f"Bundle hanya mendukung RandomForestClassifier, bukan {type(model).__name__}"
+        )
+    forest = CompiledForest.from_sklearn(model)
+    target = bundle_path(base_dir)
+    os.makedirs(target, exist_ok=True)
+
+    arrays = {}
+    for name in FOREST_ARRAYS:
+        array = np.ascontiguousarray(
+            forest.classes_ if name == "classes" else getattr(forest, name)
+        )
+        np.save(os.path.join(target, f"{name}.npy"), array, allow_pickle=False)
+        arrays[name] = {"dtype": str(array.dtype), "shape": list(array.shape)}
+    joblib.dump(model, os.path.join(target, ESTIMATOR_FILE), compress=3)
+
+    manifest = {
+        "format": BUNDLE_FORMAT,
+        "version": BUNDLE_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "feature_names": list(feature_names),
+        # Kalibrasi disimpan sebagai artefak terpisah (calibration.pkl)
+        "metadata": {key: value for key, value in metadata.items() if key != "calibration"},
+        "scaler": {
+            "feature_names_in": [str(c) for c in scaler.feature_names_in_],
+            "mean": scaler.mean_.tolist(),
+            "scale": scaler.scale_.tolist(),
+        },
+        "label_classes": [str(c) for c in label_encoder.classes_],
+        "forest": {"max_depth": forest.max_depth, "n_estimators": forest.n_estimators},
+        "arrays": arrays,
+    }
+    with open(os.path.join(target, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2, default=float)
+    return target
+
+
+def load_bundle(base_dir="deployment_files", mmap=True):
+    """
+    Memuat bundle tanpa unpickle forest:
+    - Array forest di-memory-map read-only sehingga dibagi antar proses worker
+    - Model sklearn terkompresi baru dimuat ketika ada batch besar
+    Mengembalikan tuple (model, scaler, label_encoder, feature_names, metadata).
+    """
+    source = bundle_path(base_dir)
+    with open(os.path.join(source, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("format") != BUNDLE_FORMAT or manifest.get("version") != BUNDLE_VERSION:
+        raise ValueError(
+            f"Versi bundle tidak didukung: {manifest.get('format')} v{manifest.get('version')}"
+        )
+
+    arrays = {
+        name: np.load(os.path.join(source, f"{name}.npy"),
+                      mmap_mode="r" if mmap else None, allow_pickle=False)
+        for name in FOREST_ARRAYS
+    }
+
+    def load_estimator():
+        import joblib
+        return joblib.load(os.path.join(source, ESTIMATOR_FILE))
+
+    model = CompiledForest(
+        feature=arrays["feature"],
+        threshold=arrays["threshold"],
+        children=arrays["children"],
+        value=arrays["value"],
+        roots=arrays["roots"],
+        max_depth=manifest["forest"]["max_depth"],
+        classes=np.asarray(arrays["classes"]),
+        fallback_loader=load_estimator,
+    )
+    scaler_params = manifest["scaler"]
+    scaler = BundleScaler(
+        scaler_params["feature_names_in"], scaler_params["mean"], scaler_params["scale"]
+    )
+    label_encoder = BundleLabelEncoder(manifest["label_classes"])
+    return model, scaler, label_encoder, manifest["feature_names"], manifest["metadata"]
+
+
+_PROBE = """
+import json, os, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from scoring import load_components
+components = load_components({base_dir!r}, {engine!r})
+elapsed = time.perf_counter() - start
+status = dict(
+    line.split(":", 1) for line in open("/proc/self/status")
+    if line.startswith(("VmRSS", "RssAnon", "RssFile"))
+)
+print(json.dumps({{"seconds": elapsed, **{{k: v.strip() for k, v in status.items()}}}}))
+"""
+
+
+def measure_startup(base_dir="deployment_files", engine="sklearn"):
+    """Mengukur waktu import+load dan RSS pada proses Python baru"""
+    root = os.path.dirname(os.path.abspath(__file__))
+    code = _PROBE.format(root=root, base_dir=base_dir, engine=engine)
+    output = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Membuat dan mengukur bundle artefak model")
+    parser.add_argument("command", choices=["build", "benchmark"])
+    parser.add_argument("--model-dir", default="deployment_files")
+    args = parser.parse_args(argv)
+
+    if args.command == "build":
+        from scoring import load_components
+
+        components = load_components(args.model_dir, "sklearn")
+        try:
+            target = save_bundle(components, args.model_dir)
+        except ValueError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"✅ Bundle tersimpan: {target}")
+        return 0
+
+    for label, engine in [("pickle (joblib)", "sklearn"), ("bundle (mmap)", "compiled")]:
+        result = measure_startup(args.model_dir, engine)
+        print(f"{label:16s} load {result['seconds'] * 1000:8.1f} ms | "
+              f"VmRSS {result.get('VmRSS', '-'):>10s} | "
+              f"RssAnon {result.get('RssAnon', '-'):>10s} | RssFile {result.get('RssFile', '-'):>10s}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
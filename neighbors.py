@@ -0,0 +1,213 @@
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from preprocessing import (
+    build_encoder, clean_data, compute_bmi, drop_implausible, load_dataset,
+)
+
+DATASET_PATH = "ObesityDataSet.csv"
+NEIGHBOR_INDEX_FILE = "neighbor_index.pkl"
+INDEX_VERSION = 2
+TARGET_COLUMN = "NObeyesdad"
+DEFAULT_K = 5
+# Kolom responden yang ditampilkan di samping prediksi
+DISPLAY_COLUMNS = ["Gender", "Age", "Height", "Weight", "BMI", "FAF", "CH2O", TARGET_COLUMN]
+
+
+class NeighborIndex:
+    """
+    KD-tree atas responden dataset (BMI masuk akal) dalam ruang fitur ter-scale (scaler.pkl):
+    - tree: sklearn KDTree, dibangun sekali lalu disimpan di deployment_files
+    - respondents: kolom tampilan dan label asli tiap responden
+    - feature_names dan scaler_hash: urutan fitur dan scaler saat dibangun,
+      untuk mendeteksi index usang
+    """
+
+    def __init__(self, tree, respondents, feature_names, scaler_hash=None):
+        self.tree = tree
+        self.respondents = respondents
+        self.feature_names = list(feature_names)
+        self.scaler_hash = scaler_hash
+        self.labels = respondents[TARGET_COLUMN].to_numpy()
+
+    @classmethod
+    def build(cls, data, scaler, feature_names, leaf_size=40):
+        """Membangun index dari DataFrame mentah yang sudah dibersihkan"""
+        # Import lokal: aplikasi hanya memuat index tersimpan, tanpa import sklearn saat start
+        from sklearn.neighbors import KDTree
+
+        X = build_encoder(scaler, feature_names).transform(data)
+        respondents = data.reset_index(drop=True).copy()
+        respondents["BMI"] = compute_bmi(respondents["Weight"], respondents["Height"])
+        return cls(KDTree(X, leaf_size=leaf_size), respondents[DISPLAY_COLUMNS], feature_names,
+                   scaler_fingerprint(scaler))
+
+    def query(self, X, k=DEFAULT_K):
+        """Jarak dan indeks k responden terdekat untuk matriks fitur ter-scale"""
+        return self.tree.query(np.atleast_2d(X), k=k)
+
+    def check_compatible(self, feature_names, scaler):
+        if list(feature_names) != self.feature_names:
+            raise ValueError(
+                "Index tetangga dibangun dengan urutan fitur berbeda; "
+                "bangun ulang dengan: python neighbors.py build"
+            )
+        if scaler_fingerprint(scaler) != self.scaler_hash:
+            raise ValueError(
+                "Index tetangga dibangun dengan scaler berbeda; "
+                "bangun ulang dengan: python neighbors.py build"
+            )
+
+
+def scaler_fingerprint(scaler):
+    """Hash parameter scaler (StandardScaler atau BundleScaler) tempat jarak diukur"""
+    return joblib.hash((np.asarray(scaler.mean_, dtype=np.float64),
+                        np.asarray(scaler.scale_, dtype=np.float64)))
+
+
+def index_path(base_dir="deployment_files"):
+    return os.path.join(base_dir, NEIGHBOR_INDEX_FILE)
+
+
+def has_neighbor_index(base_dir="deployment_files"):
+    return os.path.exists(index_path(base_dir))
+
+
+def save_neighbor_index(index, base_dir="deployment_files"):
+    """Menyimpan index beserta versinya di samping artefak model lain"""
+    payload = {
+        "version": INDEX_VERSION,
+        "tree": index.tree,
+        "respondents": index.respondents,
+        "feature_names": index.feature_names,
+        "scaler_hash": index.scaler_hash,
+    }
+    joblib.dump(payload, index_path(base_dir))
+    return index_path(base_dir)
+
+
+def load_neighbor_index(base_dir="deployment_files"):
+    payload = joblib.load(index_path(base_dir))
+    if payload.get("version") != INDEX_VERSION:
+        raise ValueError(f"Versi index tetangga tidak didukung: v{payload.get('version')}")
+    return NeighborIndex(payload["tree"], payload["respondents"], payload["feature_names"],
+                         payload["scaler_hash"])
+
+
+def build_neighbor_index(scaler, feature_names, data_path=DATASET_PATH):
+    """Membangun index dari dataset mentah (dibersihkan, tanpa BMI tidak masuk akal)"""
+    data = drop_implausible(clean_data(load_dataset(data_path)))
+    return NeighborIndex.build(data, scaler, feature_names)
+
+
+def ensure_neighbor_index(scaler, feature_names, base_dir="deployment_files",
+                          data_path=DATASET_PATH):
+    """
+    Index untuk serving, tanpa artefak yang harus di-commit:
+    - Index tersimpan dipakai jika versi, urutan fitur, dan scaler-nya cocok
+    - Selain itu dibangun dari dataset lalu disimpan (jika folder dapat ditulis)
+    Mengembalikan None jika index tidak ada dan dataset tidak tersedia.
+    """
+    if has_neighbor_index(base_dir):
+        try:
+            index = load_neighbor_index(base_dir)
+            index.check_compatible(feature_names, scaler)
+            return index
+        except (ValueError, AttributeError, ImportError):
+            # Index usang atau pickle dari versi sklearn lain: dibangun ulang
+            pass
+    if not os.path.exists(data_path):
+        return None
+    index = build_neighbor_index(scaler, feature_names, data_path)
+    try:
+        save_neighbor_index(index, base_dir)
+    except OSError:
+        pass
+    return index
+
+
+def similar_respondents(input_data, scaler, feature_names, index, k=DEFAULT_K):
+    """k responden dataset paling mirip dengan satu input, beserta jaraknya"""
+    index.check_compatible(feature_names, scaler)
+    X = build_encoder(scaler, feature_names).transform([input_data])
+    distances, indices = index.query(X, k)
+    result = index.respondents.iloc[indices[0]].reset_index(drop=True)
+    result.insert(0, "distance", distances[0])
+    return result
+
+
+def neighbor_labels(frame, scaler, feature_names, index, k=DEFAULT_K):
+    """
+    Mode batch untuk banyak baris:
+    - neighbor_label: label terbanyak di antara k responden terdekat
+    - neighbor_agreement: porsi tetangga yang berlabel sama dengan neighbor_label
+    """
+    index.check_compatible(feature_names, scaler)
+    X = build_encoder(scaler, feature_names).transform(frame)
+    _, indices = index.query(X, k)
+    majority = [Counter(row).most_common(1)[0] for row in index.labels[indices]]
+    return pd.DataFrame({
+        "neighbor_label": [label for label, _ in majority],
+        "neighbor_agreement": [count / k for _, count in majority],
+    }, index=frame.index)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Index KD-tree responden mirip (build) dan mode batch (score)"
+    )
+    parser.add_argument("command", choices=["build", "score"])
+    parser.add_argument("input", nargs="?", help="File CSV untuk perintah score")
+    parser.add_argument("-o", "--output", help="File CSV hasil perintah score")
+    parser.add_argument("--model-dir", default="deployment_files")
+    parser.add_argument("--data", default=DATASET_PATH,
+                        help="Dataset sumber index (perintah build)")
+    parser.add_argument("-k", type=int, default=DEFAULT_K, help="Jumlah tetangga")
+    args = parser.parse_args(argv)
+
+    from scoring import MODEL_FILES
+
+    scaler = joblib.load(os.path.join(args.model_dir, MODEL_FILES["scaler"]))
+    feature_names = joblib.load(os.path.join(args.model_dir, MODEL_FILES["feature_names"]))
+    if args.command == "build":
+        data = drop_implausible(clean_data(load_dataset(args.data)))
+        index = NeighborIndex.build(data, scaler, feature_names)
+        target = save_neighbor_index(index, args.model_dir)
+
+        X = build_encoder(scaler, feature_names).transform(data.head(200))
+        start = time.perf_counter()
+        for row in X:
+            index.query(row, args.k)
+        per_query = (time.perf_counter() - start) / len(X) * 1000
+        print(f"✅ Index {len(data):,} responden tersimpan: {target}")
+        print(f"⏱️ Query tunggal (k={args.k}): {per_query:.3f} ms")
+        return 0
+
+    if not args.input or not args.output:
+        print("❌ Perintah score membutuhkan file input dan --output", file=sys.stderr)
+        return 1
+    try:
+        index = load_neighbor_index(args.model_dir)
+        frame = pd.read_csv(args.input)
+        start = time.perf_counter()
+        labels = neighbor_labels(frame, scaler, feature_names, index, args.k)
+        result = pd.concat([frame, labels], axis=1)
+        elapsed = time.perf_counter() - start
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    result.to_csv(args.output, index=False)
+    print(f"✅ {len(frame):,} baris dicari tetangganya dalam {elapsed:.2f} detik")
+    print(f"📁 Hasil tersimpan: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
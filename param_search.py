@@ -0,0 +1,293 @@
+import argparse
+import hashlib
+import json
+import math
+import multiprocessing
+import os
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import joblib
+import numpy as np
+from sklearn.base import clone
+from sklearn.model_selection import (
+    ParameterGrid, ParameterSampler, StratifiedKFold, train_test_split,
+)
+
+RANDOM_STATE = 42
+# File JSON Lines berisi skor setiap trial (model, parameter, fold, resource)
+SEARCH_STORE = "search_results.jsonl"
+SEARCH_MODES = ["random", "grid", "halving"]
+DEFAULT_N_SPLITS = 5
+# Successive halving: kandidat dibagi (dan resource dikali) faktor ini setiap ronde
+HALVING_FACTOR = 3
+
+
+class ResultStore:
+    """
+    Skor trial yang sudah selesai, disimpan append-only di file JSON Lines:
+    - Setiap baris ditulis dan di-flush segera setelah trial selesai
+    - Baris terakhir yang terpotong (proses dihentikan saat menulis) diabaikan
+    - path None = hanya di memori (tanpa resume)
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.records = {}
+        if path and os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.records[record["key"]] = record
+
+    def get(self, key):
+        return self.records.get(key)
+
+    def add(self, record):
+        self.records[record["key"]] = record
+        if self.path:
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record, default=str) + "\n")
+
+
+def data_fingerprint(X, y):
+    """Hash data latih; skor tersimpan hanya dipakai ulang untuk data yang sama persis"""
+    return joblib.hash((X, y))
+
+
+def trial_key(model_name, estimator, params, fold, n_splits, resource, fingerprint):
+    """Kunci trial: model dan parameter dasarnya (tanpa n_jobs), parameter trial, fold, data"""
+    base = {k: v for k, v in estimator.get_params(deep=False).items() if k != "n_jobs"}
+    payload = json.dumps(
+        [model_name, base, params, fold, n_splits, resource, fingerprint],
+        sort_keys=True, default=str,
+    )
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+def subsample(y, resource, seed=RANDOM_STATE):
+    """Indeks subset stratified berukuran resource (deterministik); seluruh data jika cukup"""
+    if resource >= len(y):
+        return np.arange(len(y))
+    indices, _ = train_test_split(np.arange(len(y)), train_size=resource,
+                                  random_state=seed, stratify=y)
+    return np.sort(indices)
+
+
+def cv_splits(y, resource, n_splits=DEFAULT_N_SPLITS, seed=RANDOM_STATE):
+    """Fold StratifiedKFold (tanpa shuffle, seperti cv=5 sklearn) di atas subset resource"""
+    indices = subsample(y, resource, seed)
+    folds = StratifiedKFold(n_splits=n_splits).split(indices, y[indices])
+    return [(indices[train], indices[test]) for train, test in folds]
+
+
+# --- Worker Process Pool ---
+# State worker; pada start method "fork" data diwarisi dari proses induk
+_SEARCH = {}
+
+
+def _init_worker(state):
+    if "X" not in _SEARCH:
+        _SEARCH.update(state)
+
+
+def _run_trial(model_name, params, resource, fold):
+    """
+    Dijalankan di worker: fit satu kandidat pada satu fold, mengembalikan akurasi.
+    Kombinasi yang gagal di-fit mendapat skor NaN (seperti error_score sklearn).
+    """
+    warnings.filterwarnings("ignore")
+    if _SEARCH.get("folds") is not None:
+        X_train, y_train, X_test, y_test = _SEARCH["folds"].fold(fold)
+        if resource < len(y_train):
+            rows = subsample(y_train, resource, _SEARCH["seed"])
+            X_train, y_train = X_train[rows], y_train[rows]
+    else:
+        X, y = _SEARCH["X"], _SEARCH["y"]
+        train, test = _SEARCH["splits"][resource][fold]
+        X_train, y_train, X_test, y_test = X.iloc[train], y[train], X.iloc[test], y[test]
+    model = clone(_SEARCH["models"][model_name]).set_params(**params)
+    if "n_jobs" in model.get_params():
+        # Paralelisme sudah di tingkat trial
+        model.set_params(n_jobs=1)
+    start = time.perf_counter()
+    try:
+        model.fit(X_train, y_train)
+        score = model.score(X_test, y_test)
+    except ValueError:
+        score = np.nan
+    return float(score), time.perf_counter() - start
+
+
+class SearchRunner:
+    """
+    Menjalankan trial hyperparameter di process pool dengan skor yang dapat di-resume:
+    - Trial yang sudah ada di ResultStore tidak dihitung ulang
+    - Mode random (ParameterSampler, kandidat sama dengan RandomizedSearchCV),
+      grid (semua kombinasi), atau halving (successive halving atas resource sampel)
+    - folds (FoldCache, opsional): fold dibaca dari cache (SMOTE dan scaling per fold)
+      alih-alih dipotong dari X dan y
+    """
+
+    def __init__(self, models, X, y, store=None, n_splits=DEFAULT_N_SPLITS, workers=None,
+                 seed=RANDOM_STATE, folds=None):
+        self.models = models
+        self.X = X
+        self.y = np.asarray(y)
+        self.store = store or ResultStore()
+        self.n_splits = n_splits if folds is None else folds.n_splits
+        self.workers = workers or os.cpu_count() or 1
+        self.seed = seed
+        self.folds = folds
+        self.fingerprint = data_fingerprint(X, self.y) if folds is None else folds.fingerprint
+        # Resource penuh: semua baris latih (fold cache: fold latih terbesar)
+        self.n_samples = len(self.y) if folds is None else max(folds.train_sizes)
+        self.splits = {}
+        self.pool = None
+
+    def __enter__(self):
+        context = None
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+        state = {"X": self.X, "y": self.y, "models": self.models, "splits": self.splits,
+                 "folds": self.folds, "seed": self.seed}
+        # Split untuk semua resource disiapkan sebelum fork agar ikut diwarisi worker
+        for resource in self.resources() if self.folds is None else []:
+            self.splits[resource] = cv_splits(self.y, resource, self.n_splits, self.seed)
+        _SEARCH.update(state)
+        self.pool = ProcessPoolExecutor(self.workers, mp_context=context,
+                                        initializer=_init_worker, initargs=(state,))
+        return self
+
+    def __exit__(self, *exc):
+        self.pool.shutdown(cancel_futures=True)
+        _SEARCH.clear()
+
+    def resources(self):
+        """Ukuran resource yang mungkin dipakai successive halving, ditambah data penuh"""
+        smallest = self.n_splits * len(np.unique(self.y)) * 2
+        resources, resource = [self.n_samples], smallest
+        while resource < self.n_samples:
+            resources.append(resource)
+            resource *= HALVING_FACTOR
+        return resources
+
+    def evaluate(self, model_name, candidates, resource=None):
+        """
+        Rata-rata akurasi CV setiap kandidat pada resource tertentu (default: data penuh);
+        kandidat dengan fold gagal mendapat -inf agar selalu berada di peringkat terakhir.
+        Mengembalikan (skor per kandidat, jumlah trial dihitung, jumlah trial dari store).
+        """
+        resource = resource or self.n_samples
+        estimator = self.models[model_name]
+        scores = np.zeros((len(candidates), self.n_splits))
+        pending = {}
+        reused = 0
+        for i, params in enumerate(candidates):
+            for fold in range(self.n_splits):
+                key = trial_key(model_name, estimator, params, fold, self.n_splits, resource,
+                                self.fingerprint)
+                record = self.store.get(key)
+                if record is not None:
+                    scores[i, fold] = record["score"]
+                    reused += 1
+                    continue
+                future = self.pool.submit(_run_trial, model_name, params, resource, fold)
+                pending[future] = (i, fold, key)
+        for future in as_completed(pending):
+            i, fold, key = pending[future]
+            score, seconds = future.result()
+            scores[i, fold] = score
+            self.store.add({
+                "key": key, "model": model_name, "params": candidates[i], "fold": fold,
+                "resource": resource, "score": score, "fit_seconds": seconds,
+            })
+        means = scores.mean(axis=1)
+        return np.where(np.isnan(means), -np.inf, means), len(pending), reused
+
+    def candidates(self, model_name, grid, mode="random", n_iter=20):
+        if mode == "random":
+            with warnings.catch_warnings():
+                # n_iter lebih besar dari ukuran grid: semua kombinasi dipakai
+                warnings.simplefilter("ignore", UserWarning)
+                return list(ParameterSampler(grid, n_iter, random_state=self.seed))
+        return list(ParameterGrid(grid))
+
+    def search(self, model_name, grid, mode="random", n_iter=20):
+        """
+        Mencari parameter terbaik untuk satu model:
+        - random/grid: semua kandidat dievaluasi dengan CV penuh
+        - halving: semua kombinasi grid mulai dari resource kecil; setiap ronde hanya
+          1/HALVING_FACTOR kandidat terbaik yang lanjut dengan resource HALVING_FACTOR kali
+          lipat, hingga tersisa paling banyak HALVING_FACTOR kandidat untuk data penuh
+        Kandidat dengan skor sama: yang lebih awal menang (seperti rank sklearn).
+        """
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Mode pencarian tidak dikenal: {mode}")
+        candidates = self.candidates(model_name, grid, mode, n_iter)
+        computed = reused = 0
+        if mode == "halving":
+            for resource in sorted(self.resources())[:-1]:
+                if len(candidates) <= HALVING_FACTOR:
+                    break
+                scores, n_computed, n_reused = self.evaluate(model_name, candidates, resource)
+                computed, reused = computed + n_computed, reused + n_reused
+                n_keep = math.ceil(len(candidates) / HALVING_FACTOR)
+                keep = sorted(np.argsort(-scores, kind="stable")[:n_keep])
+                candidates = [candidates[i] for i in keep]
+
+        scores, n_computed, n_reused = self.evaluate(model_name, candidates)
+        computed, reused = computed + n_computed, reused + n_reused
+        best = int(np.argmax(scores))
+        return {
+            "best_params": candidates[best],
+            "cv_score": float(scores[best]),
+            "trials_computed": computed,
+            "trials_reused": reused,
+        }
+
+
+def main(argv=None):
+    # Import lokal karena training mengimpor modul ini
+    from fold_cache import FoldCache
+    from training import PARAM_GRIDS, build_models, prepare_training_data
+
+    parser = argparse.ArgumentParser(
+        description="Pencarian hyperparameter paralel yang dapat di-resume (skor trial disimpan)"
+    )
+    parser.add_argument("--data", default="ObesityDataSet.csv")
+    parser.add_argument("--model", action="append", choices=list(PARAM_GRIDS),
+                        help="Model yang dicari (boleh berulang; default: semua grid)")
+    parser.add_argument("--search", choices=SEARCH_MODES, default="halving")
+    parser.add_argument("--n-iter", type=int, default=20,
+                        help="Jumlah kandidat untuk mode random")
+    parser.add_argument("--store", default=SEARCH_STORE,
+                        help="File hasil trial (JSON Lines) untuk resume")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Jumlah proses worker (default: semua core)")
+    parser.add_argument("--fold-cache", default=None, metavar="DIR",
+                        help="Pakai cache fold (SMOTE dan scaling per fold) di folder ini")
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore")
+    X_train, _, y_train, _, _, _, _, cv_rows = prepare_training_data(args.data, [])
+    folds = FoldCache.build(args.fold_cache, *cv_rows) if args.fold_cache else None
+    store = ResultStore(args.store)
+    with SearchRunner(build_models(), X_train, y_train, store, workers=args.workers,
+                      folds=folds) as runner:
+        for name in args.model or list(PARAM_GRIDS):
+            start = time.perf_counter()
+            result = runner.search(name, PARAM_GRIDS[name], args.search, args.n_iter)
+            print(f"✅ {name}: CV {result['cv_score']:.4f}, parameter {result['best_params']}")
+            print(f"   ⏱️ {time.perf_counter() - start:.1f} detik, "
+                  f"{result['trials_computed']} trial dihitung, "
+                  f"{result['trials_reused']} dari {args.store}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
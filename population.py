@@ -0,0 +1,153 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from preprocessing import (
+    AGE_LABELS, age_groups, clean_data, compute_bmi, drop_implausible, load_dataset,
+)
+
+DATASET_PATH = "ObesityDataSet.csv"
+TARGET_COLUMN = "NObeyesdad"
+# Metrik yang dibandingkan dengan populasi dataset
+POPULATION_METRICS = ["BMI", "FAF", "CH2O"]
+# Batas kategori BMI WHO; profil "mirip" = gender, kelompok umur, dan kategori BMI sama
+BMI_BANDS = [18.5, 25.0, 30.0, 35.0, 40.0]
+# Kelompok dengan anggota lebih sedikit dari ini diganti kelompok gender saja
+MIN_GROUP_SIZE = 20
+
+
+def load_population(path=DATASET_PATH):
+    """
+    Membaca dataset untuk perbandingan populasi:
+    - Dibersihkan seperti pipeline training (clean_data)
+    - Baris dengan BMI tidak masuk akal dibuang (drop_implausible)
+    - Kolom BMI dan Age_Group ditambahkan
+    """
+    df = drop_implausible(clean_data(load_dataset(path)))
+    df["BMI"] = compute_bmi(df["Weight"], df["Height"])
+    df["Age_Group"] = age_groups(df["Age"])
+    return df
+
+
+class PopulationIndex:
+    """
+    Agregat dataset yang dihitung sekali:
+    - sorted_values[(gender, age_group)][metric]: array terurut untuk persentil (binary search)
+    - class_counts[(gender, age_group, bmi_band)]: sebaran kelas profil yang mirip
+    - age_group None = seluruh gender (fallback untuk kelompok kecil)
+    Setiap lookup berupa binary search atau akses dict, tanpa memindai DataFrame.
+    """
+
+    def __init__(self, sorted_values, class_counts, classes, n_rows):
+        self.sorted_values = sorted_values
+        self.class_counts = class_counts
+        self.classes = classes
+        self.n_rows = n_rows
+
+    @classmethod
+    def from_frame(cls, df):
+        classes = sorted(df[TARGET_COLUMN].unique())
+        sorted_values = {}
+        for key, group in df.groupby(["Gender", "Age_Group"]):
+            sorted_values[key] = {m: np.sort(group[m].to_numpy(np.float64))
+                                  for m in POPULATION_METRICS}
+        for gender, group in df.groupby("Gender"):
+            sorted_values[(gender, None)] = {m: np.sort(group[m].to_numpy(np.float64))
+                                             for m in POPULATION_METRICS}
+
+        bands = pd.Series(np.digitize(df["BMI"].to_numpy(np.float64), BMI_BANDS), index=df.index)
+        class_counts = {}
+        for age_group in (df["Age_Group"], pd.Series(None, index=df.index)):
+            counts = (df.groupby([df["Gender"], age_group, bands], dropna=False)[TARGET_COLUMN]
+                      .value_counts().unstack(fill_value=0).reindex(columns=classes, fill_value=0))
+            for (gender, group, band), row in counts.iterrows():
+                class_counts[(gender, None if pd.isna(group) else group, int(band))] = row.to_numpy()
+        return cls(sorted_values, class_counts, classes, len(df))
+
+    def group_key(self, gender, age_group):
+        """Kelompok (gender, umur); fallback ke gender saja jika anggotanya terlalu sedikit"""
+        key = (gender, age_group)
+        group = self.sorted_values.get(key)
+        if group is None or len(group[POPULATION_METRICS[0]]) < MIN_GROUP_SIZE:
+            return (gender, None)
+        return key
+
+    def percentile(self, gender, age_group, metric, value):
+        """Persentil (0-100, mid-rank) sebuah nilai di dalam kelompoknya"""
+        values = self.sorted_values[self.group_key(gender, age_group)][metric]
+        below = np.searchsorted(values, value, side="left")
+        equal_or_below = np.searchsorted(values, value, side="right")
+        return float((below + equal_or_below) / 2 / len(values) * 100)
+
+    def similar_profiles(self, gender, age_group, bmi):
+        """Sebaran kelas (proporsi) responden dengan gender, kelompok umur, dan kategori BMI sama"""
+        gender, age_group = self.group_key(gender, age_group)
+        counts = self.class_counts.get((gender, age_group, int(np.digitize(bmi, BMI_BANDS))))
+        if counts is None:
+            return pd.Series(0.0, index=self.classes), 0
+        return pd.Series(counts / counts.sum(), index=self.classes), int(counts.sum())
+
+    def compare(self, input_data, bmi):
+        """
+        Ringkasan posisi satu pengguna terhadap populasi:
+        - group: label kelompok pembanding dan jumlah anggotanya
+        - percentiles: persentil BMI, FAF, dan CH2O
+        - similar: sebaran kelas profil mirip dan jumlahnya
+        """
+        gender = input_data["Gender"]
+        age_group = age_groups([input_data["Age"]])[0]
+        key = self.group_key(gender, age_group)
+        values = {"BMI": bmi, "FAF": input_data["FAF"], "CH2O": input_data["CH2O"]}
+        distribution, n_similar = self.similar_profiles(gender, age_group, bmi)
+        return {
+            "group": gender if key[1] is None else f"{gender}, {AGE_LABELS[age_group]}",
+            "group_size": len(self.sorted_values[key][POPULATION_METRICS[0]]),
+            "percentiles": {m: self.percentile(gender, age_group, m, values[m])
+                            for m in POPULATION_METRICS},
+            "similar": distribution,
+            "n_similar": n_similar,
+        }
+
+
+def build_population_index(path=DATASET_PATH):
+    """Membaca dataset dan membangun PopulationIndex"""
+    return PopulationIndex.from_frame(load_population(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Bandingkan satu profil dengan populasi ObesityDataSet.csv"
+    )
+    parser.add_argument("--data", default=DATASET_PATH)
+    parser.add_argument("--gender", default="Male", choices=["Male", "Female"])
+    parser.add_argument("--age", type=float, default=25)
+    parser.add_argument("--height", type=float, default=1.70)
+    parser.add_argument("--weight", type=float, default=70.0)
+    parser.add_argument("--faf", type=float, default=1.0)
+    parser.add_argument("--ch2o", type=float, default=2.0)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    index = build_population_index(args.data)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    input_data = {"Gender": args.gender, "Age": args.age, "FAF": args.faf, "CH2O": args.ch2o}
+    bmi = float(compute_bmi(args.weight, args.height))
+    start = time.perf_counter()
+    result = index.compare(input_data, bmi)
+    lookup_ms = (time.perf_counter() - start) * 1000
+
+    print(f"✅ Index {index.n_rows:,} responden dibangun dalam {build_ms:.1f} ms, "
+          f"lookup {lookup_ms:.3f} ms")
+    print(f"👥 Kelompok: {result['group']} ({result['group_size']} orang)")
+    for metric, value in result["percentiles"].items():
+        print(f"   {metric:5s} persentil {value:.0f}")
+    print(f"🧑‍🤝‍🧑 Profil mirip ({result['n_similar']} orang):")
+    print(result["similar"][result["similar"] > 0].round(3).to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,92 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from preprocessing import RAW_COLUMNS, RAW_NUMERICAL_COLUMNS, column_values
+
+# Pembulatan angka sebelum dijadikan kunci (slider memakai langkah 0.1)
+KEY_DECIMALS = 6
+
+
+def make_cache_keys(data):
+    """
+    Membuat kunci cache kanonik untuk setiap baris input:
+    - Kolom numerik diubah ke float dan dibulatkan (21, "21", 21.0 dianggap sama)
+    - Kolom kategori dipakai apa adanya, nilai kosong menjadi None
+    data: dict tunggal, list of dict, atau DataFrame
+    """
+    if isinstance(data, dict):
+        data = [data]
+    columns = []
+    for col in RAW_COLUMNS:
+        values = column_values(data, col)
+        if col in RAW_NUMERICAL_COLUMNS:
+            numeric = np.asarray(pd.to_numeric(values, errors="coerce"), dtype=np.float64)
+            values = np.round(numeric, KEY_DECIMALS).astype(object)
+            values[np.isnan(numeric)] = None
+        columns.append(values.tolist())
+    return list(zip(*columns))
+
+
+class PredictionCache:
+    """
+    Cache LRU + TTL untuk probabilitas prediksi:
+    - Kunci: hasil make_cache_keys (input yang dinormalisasi)
+    - Nilai: array probabilitas kelas dari model
+    - Menyimpan penghitung hit/miss untuk monitoring
+    """
+
+    def __init__(self, max_size=10_000, ttl_seconds=None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self.ttl_seconds is None or time.monotonic() - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def record_hits(self, count):
+        """Mencatat hit untuk baris duplikat yang dilayani tanpa lookup terpisah"""
+        with self._lock:
+            self.hits += count
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
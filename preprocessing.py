@@ -0,0 +1,350 @@
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+# --- Definisi Fitur ---
+# Kolom prediktor mentah sesuai ObesityDataSet.csv (tanpa target NObeyesdad)
+RAW_COLUMNS = [
+    "Age", "Gender", "Height", "Weight", "CALC", "FAVC", "FCVC", "NCP",
+    "SCC", "SMOKE", "CH2O", "family_history_with_overweight", "FAF", "TUE",
+    "CAEC", "MTRANS",
+]
+RAW_NUMERICAL_COLUMNS = ["Age", "Height", "Weight", "FCVC", "NCP", "CH2O", "FAF", "TUE"]
+NUMERICAL_FEATURES = [
+    "Age", "Height", "Weight", "BMI", "FCVC", "NCP", "CH2O", "FAF", "TUE"
+]
+BINARY_COLUMNS = ["FAVC", "SCC", "SMOKE", "family_history_with_overweight"]
+CATEGORICAL_COLUMNS = [col for col in RAW_COLUMNS if col not in RAW_NUMERICAL_COLUMNS]
+
+# Batas kelompok umur (kiri inklusif) dan label yang dipakai saat training
+AGE_BINS = [18, 25, 35, 50]
+AGE_GROUPS = ["Teen", "Young_Adult", "Adult", "Middle_Age", "Senior"]
+# Label kelompok umur untuk tampilan dasbor
+AGE_LABELS = dict(zip(AGE_GROUPS, ["Remaja", "Dewasa Muda", "Dewasa", "Paruh Baya", "Senior"]))
+
+# Rentang BMI yang masuk akal; di luar ini tinggi/berat di dataset rusak (mis. 2.8 m, 400 kg)
+PLAUSIBLE_BMI = (12.0, 60.0)
+
+# Nilai positif untuk fitur biner <kolom>_encoded
+BINARY_POSITIVE = {col: "yes" for col in BINARY_COLUMNS}
+BINARY_POSITIVE["Gender"] = "Male"
+
+# Level one-hot terurut; level pertama adalah referensi (drop_first) tanpa kolom.
+# "Senior" tidak muncul setelah winsorization umur sehingga tidak punya kolom.
+ONEHOT_LEVELS = {
+    "CALC": ["Always", "Frequently", "Sometimes", "no"],
+    "CAEC": ["Always", "Frequently", "Sometimes", "no"],
+    "MTRANS": ["Automobile", "Bike", "Motorbike", "Public_Transportation", "Walking"],
+    "Age_Group": ["Adult", "Middle_Age", "Teen", "Young_Adult"],
+}
+
+# Spesifikasi tunggal yang dipakai transform training (pandas) dan encoder serving
+FEATURE_SPEC = {
+    "numerical": NUMERICAL_FEATURES,
+    "binary": BINARY_POSITIVE,
+    "onehot": ONEHOT_LEVELS,
+    "age_bins": AGE_BINS,
+    "age_groups": AGE_GROUPS,
+}
+
+
+def spec_feature_names(spec=FEATURE_SPEC):
+    """Urutan kolom fitur yang dihasilkan spesifikasi (sama seperti notebook)"""
+    return (
+        list(spec["numerical"])
+        + [f"{col}_encoded" for col in spec["binary"]]
+        + [f"{col}_{level}" for col, levels in spec["onehot"].items() for level in levels[1:]]
+    )
+
+
+def calculate_bmi(weight, height):
+    """Menghitung BMI berdasarkan berat dan tinggi badan"""
+    return weight / (height**2) if height > 0 else 0
+
+
+def compute_bmi(weight, height):
+    """Versi vektor calculate_bmi untuk array NumPy"""
+    weight = np.asarray(weight, dtype=np.float64)
+    height = np.asarray(height, dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(height > 0, weight / height**2, 0.0)
+
+
+def age_groups(age, spec=FEATURE_SPEC):
+    """Kelompok umur (label training) untuk array umur"""
+    labels = np.array(spec["age_groups"], dtype=object)
+    return labels[np.digitize(np.asarray(age, dtype=np.float64), spec["age_bins"])]
+
+
+def categorize_age(age):
+    """Kategorisasi umur sesuai kelompok yang dipakai model"""
+    return AGE_GROUPS[int(np.digitize(age, AGE_BINS))]
+
+
+def column_values(data, column):
+    """Ambil satu kolom mentah sebagai array object (None jika kolom tidak ada)"""
+    if isinstance(data, pd.DataFrame):
+        if column in data.columns:
+            return data[column].to_numpy(dtype=object, na_value=None)
+        return np.full(len(data), None, dtype=object)
+    return np.array([row.get(column) for row in data], dtype=object)
+
+
+def numeric_values(data, column):
+    """Kolom numerik sebagai float64; kolom DataFrame yang sudah numerik tidak di-parse ulang"""
+    if isinstance(data, pd.DataFrame) and column in data.columns:
+        if pd.api.types.is_numeric_dtype(data[column].dtype):
+            return data[column].to_numpy(dtype=np.float64, na_value=np.nan)
+    return np.asarray(pd.to_numeric(column_values(data, column), errors="coerce"),
+                      dtype=np.float64)
+
+
+def level_matcher(data, column):
+    """
+    Mengembalikan fungsi level -> mask boolean untuk satu kolom kategori:
+    - Kolom pandas Categorical (misalnya dictionary Arrow/Parquet) dibandingkan
+      lewat kode integer tanpa perbandingan string per baris
+    - Kolom lain dibandingkan sebagai array object
+    """
+    if isinstance(data, pd.DataFrame) and column in data.columns:
+        values = data[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            categories = values.cat.categories
+            codes = values.cat.codes.to_numpy()
+
+            def match(level):
+                code = categories.get_indexer([level])[0]
+                return codes == code if code >= 0 else np.zeros(len(codes), dtype=bool)
+            return match
+    values = column_values(data, column)
+    return lambda level: values == level
+
+
+class FeatureEncoder:
+    """
+    Encoder terkompilasi untuk preprocessing batch:
+    - Dibangun sekali dari FEATURE_SPEC, feature_names, dan scaler
+    - Setiap level one-hot mendapat slot kolom tetap (tidak bergantung isi batch)
+    - Menghasilkan matriks float32 yang sudah dialokasikan di awal
+    """
+
+    def __init__(self, scaler, feature_names, spec=FEATURE_SPEC):
+        self.spec = spec
+        self.feature_names = list(feature_names)
+        self.n_features = len(self.feature_names)
+        index = {name: i for i, name in enumerate(self.feature_names)}
+
+        # Slot fitur numerik beserta parameter scaler-nya
+        scaled_columns = list(
+            getattr(scaler, "feature_names_in_", NUMERICAL_FEATURES)
+        )
+        self.scale_slots = np.array(
+            [index[col] for col in scaled_columns if col in index], dtype=np.intp
+        )
+        self.scale_columns = [col for col in scaled_columns if col in index]
+        keep = [i for i, col in enumerate(scaled_columns) if col in index]
+        self.mean = np.asarray(scaler.mean_, dtype=np.float64)[keep]
+        self.scale = np.asarray(scaler.scale_, dtype=np.float64)[keep]
+        self.fill_values = dict(zip(self.scale_columns, self.mean))
+        self.numeric_slots = [
+            (col, index[col]) for col in self.spec["numerical"]
+            if col in index and col not in self.scale_columns
+        ]
+
+        # Slot fitur biner (yes/no dan gender)
+        self.binary_slots = [
+            (col, positive, index[f"{col}_encoded"])
+            for col, positive in self.spec["binary"].items() if f"{col}_encoded" in index
+        ]
+
+        # Slot one-hot: level referensi (drop_first) tidak punya slot
+        self.onehot_slots = [
+            (col, level, index[f"{col}_{level}"])
+            for col, levels in self.spec["onehot"].items()
+            for level in levels[1:] if f"{col}_{level}" in index
+        ]
+
+    def transform(self, data):
+        """
+        Mengubah input mentah menjadi matriks fitur:
+        - data: dict tunggal, list of dict, atau DataFrame
+        - Nilai numerik kosong diisi rata-rata scaler (bernilai 0 setelah scaling)
+        - Kategori yang tidak dikenal tidak mengaktifkan slot mana pun
+        """
+        if isinstance(data, dict):
+            data = [data]
+        n_rows = len(data)
+        matrix = np.zeros((n_rows, self.n_features), dtype=np.float32)
+
+        # Kolom numerik mentah
+        numeric = {}
+        for col in RAW_NUMERICAL_COLUMNS:
+            values = numeric_values(data, col)
+            if col in self.fill_values:
+                values = np.where(np.isnan(values), self.fill_values[col], values)
+            numeric[col] = values
+
+        # Hitung BMI
+        numeric["BMI"] = compute_bmi(numeric["Weight"], numeric["Height"])
+
+        for col, slot in self.numeric_slots:
+            matrix[:, slot] = numeric[col]
+
+        # Scaling numerical features
+        if len(self.scale_slots):
+            raw = np.column_stack([numeric[col] for col in self.scale_columns])
+            matrix[:, self.scale_slots] = (raw - self.mean) / self.scale
+
+        # Encoding binary columns
+        for col, positive, slot in self.binary_slots:
+            matrix[:, slot] = level_matcher(data, col)(positive)
+
+        # One-hot encoding dengan slot tetap
+        matchers = {
+            col: level_matcher(data, col) for col in self.spec["onehot"] if col != "Age_Group"
+        }
+        age_group = age_groups(numeric["Age"], self.spec)
+        matchers["Age_Group"] = lambda level: age_group == level
+        for col, level, slot in self.onehot_slots:
+            matrix[:, slot] = matchers[col](level)
+
+        return matrix
+
+
+_ENCODER_CACHE = {}
+
+
+def build_encoder(scaler, feature_names):
+    """Mengambil encoder terkompilasi dari cache, atau membangunnya sekali"""
+    key = (id(scaler), tuple(feature_names))
+    cached = _ENCODER_CACHE.get(key)
+    if cached is None or cached[0] is not scaler:
+        cached = (scaler, FeatureEncoder(scaler, feature_names))
+        _ENCODER_CACHE[key] = cached
+    return cached[1]
+
+
+def preprocess_input(input_data, scaler, feature_names):
+    """
+    Preprocessing input user:
+    - Hitung BMI
+    - Encode binary dan kategori
+    - One-hot encoding
+    - Normalisasi fitur numerik
+    Menerima dict tunggal, list of dict, atau DataFrame dan mengembalikan
+    matriks float32 dengan urutan kolom sesuai feature_names.
+    """
+    return build_encoder(scaler, feature_names).transform(input_data)
+
+
+# --- Pembersihan Data Mentah ---
+def load_dataset(path):
+    """Membaca dataset mentah; '?' diperlakukan sebagai nilai kosong"""
+    return pd.read_csv(path).replace("?", np.nan)
+
+
+def clean_data(df):
+    """
+    Pembersihan data seperti notebook:
+    - Kategori kosong diisi modus, numerik kosong diisi median
+    - Baris duplikat dihapus
+    """
+    df = df.copy()
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].fillna(df[col].mode()[0])
+    for col in RAW_NUMERICAL_COLUMNS:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+        df[col] = df[col].fillna(df[col].median())
+    return df.drop_duplicates().reset_index(drop=True)
+
+
+def drop_implausible(df):
+    """
+    Membuang responden dengan BMI di luar PLAUSIBLE_BMI untuk data pembanding
+    (populasi dan tetangga terdekat); winsorization saja tetap menyisakan label
+    yang bertentangan dengan BMI-nya
+    """
+    bmi = compute_bmi(df["Weight"], df["Height"])
+    low, high = PLAUSIBLE_BMI
+    return df[(bmi >= low) & (bmi <= high)].reset_index(drop=True)
+
+
+# --- Transform Training (pandas) ---
+def build_feature_frame(data, spec=FEATURE_SPEC):
+    """
+    Transform vektor pandas untuk training dari FEATURE_SPEC yang sama:
+    - Input DataFrame mentah yang sudah dibersihkan (tanpa nilai kosong)
+    - Kolom sesuai spec_feature_names(), fitur numerik belum di-scale
+    """
+    numeric = data[RAW_NUMERICAL_COLUMNS].apply(pd.to_numeric, errors="coerce").astype(np.float64)
+    numeric["BMI"] = compute_bmi(numeric["Weight"], numeric["Height"])
+    categorical = {col: data[col] for col in spec["onehot"] if col != "Age_Group"}
+    categorical["Age_Group"] = pd.Series(age_groups(numeric["Age"], spec), index=data.index)
+
+    columns = {col: numeric[col] for col in spec["numerical"]}
+    for col, positive in spec["binary"].items():
+        columns[f"{col}_encoded"] = (data[col] == positive).astype(int)
+    for col, levels in spec["onehot"].items():
+        for level in levels[1:]:
+            columns[f"{col}_{level}"] = (categorical[col] == level).astype(int)
+    return pd.DataFrame(columns, index=data.index)
+
+
+def transform_frame(data, scaler, feature_names, spec=FEATURE_SPEC):
+    """build_feature_frame + StandardScaler, diurutkan sesuai feature_names"""
+    frame = build_feature_frame(data, spec).reindex(columns=list(feature_names), fill_value=0)
+    scaled = list(scaler.feature_names_in_)
+    frame[scaled] = scaler.transform(frame[scaled])
+    return frame
+
+
+def check_feature_skew(data, scaler, feature_names, spec=FEATURE_SPEC):
+    """
+    Membandingkan transform training (pandas) dengan FeatureEncoder serving:
+    - Urutan kolom spesifikasi harus sama dengan feature_names artefak
+    - Matriks float32 keduanya harus identik untuk setiap baris
+    """
+    expected = transform_frame(data, scaler, feature_names, spec).to_numpy(dtype=np.float32)
+    actual = FeatureEncoder(scaler, feature_names, spec).transform(data)
+    mismatch = expected != actual
+    columns = [name for name, bad in zip(feature_names, mismatch.any(axis=0)) if bad]
+    names_match = spec_feature_names(spec) == list(feature_names)
+    return {
+        "max_abs_diff": float(np.abs(expected - actual).max()) if expected.size else 0.0,
+        "mismatched_columns": columns,
+        "feature_names_match": names_match,
+        "passed": names_match and not columns,
+    }
+
+
+def main(argv=None):
+    # Import lokal karena scoring mengimpor modul ini
+    import joblib
+
+    from scoring import MODEL_FILES
+
+    parser = argparse.ArgumentParser(
+        description="Uji skew fitur antara transform training dan encoder serving"
+    )
+    parser.add_argument("--model-dir", default="deployment_files")
+    parser.add_argument("--data", default="ObesityDataSet.csv")
+    args = parser.parse_args(argv)
+
+    scaler = joblib.load(os.path.join(args.model_dir, MODEL_FILES["scaler"]))
+    feature_names = joblib.load(os.path.join(args.model_dir, MODEL_FILES["feature_names"]))
+    data = clean_data(load_dataset(args.data))
+
+    result = check_feature_skew(data, scaler, feature_names)
+    status = "✅" if result["passed"] else "❌"
+    print(f"{status} Skew fitur pada {len(data):,} baris: selisih maks {result['max_abs_diff']:.2e}")
+    if not result["feature_names_match"]:
+        print(f"❌ Urutan fitur spesifikasi berbeda dari {MODEL_FILES['feature_names']}")
+    if result["mismatched_columns"]:
+        print(f"❌ Kolom berbeda: {', '.join(result['mismatched_columns'])}")
+    return 0 if result["passed"] else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
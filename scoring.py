@@ -0,0 +1,540 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from calibration import calibrate, load_calibration
+from forest_engine import CompiledForest, compile_forest
+from metrics import timer
+from model_bundle import has_bundle, load_bundle
+from prediction_cache import PredictionCache, make_cache_keys
+from preprocessing import RAW_COLUMNS, RAW_NUMERICAL_COLUMNS, build_encoder, calculate_bmi
+
+# Nama file komponen model di dalam folder deployment
+MODEL_FILES = {
+    "model": "final_model.pkl",
+    "scaler": "scaler.pkl",
+    "label_encoder": "label_encoder.pkl",
+    "feature_names": "feature_names.pkl",
+    "metadata": "model_metadata.pkl",
+}
+OUTPUT_COLUMNS = ["predicted_class", "confidence", "BMI", "health_score"]
+DEFAULT_CHUNKSIZE = 50_000
+DEFAULT_CACHE_SIZE = 100_000
+ENGINES = ["auto", "sklearn", "compiled"]
+# teacher = forest hasil training, student = model ringkas hasil distillation.py
+MODEL_VARIANTS = ["teacher", "student"]
+STUDENT_DIR = "student"
+# Format file batch berdasarkan ekstensi; .arrow ditulis sebagai Arrow IPC stream
+FILE_FORMATS = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet",
+                ".arrow": "arrow", ".feather": "arrow"}
+# Kolom kategori dibaca sebagai dictionary Arrow (pandas Categorical)
+DICTIONARY_COLUMNS = [col for col in RAW_COLUMNS if col not in RAW_NUMERICAL_COLUMNS]
+
+
+def load_components(base_dir="deployment_files", engine="auto", early_exit=None):
+    """
+    Memuat komponen model tanpa ketergantungan Streamlit.
+    Mengembalikan tuple (model, scaler, label_encoder, feature_names, metadata).
+    - engine="sklearn": file pickle terpisah seperti semula
+    - engine="compiled": CompiledForest dari bundle (lihat model_bundle.py),
+      atau hasil kompilasi pickle jika bundle belum dibuat
+    - engine="auto": bundle jika tersedia, selain itu pickle
+    Jika calibration.pkl tersedia, isinya disimpan di metadata["calibration"].
+    early_exit (misalnya 1.0 atau 0.99) mengaktifkan mode anytime CompiledForest;
+    model dikompilasi jika perlu. Probabilitasnya hanya dari pohon yang sudah
+    dievaluasi, jadi kalibrasi (di-fit pada confidence forest penuh) tidak dipasang
+    dan metadata["confidence_truncated"] bernilai True.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"Engine tidak dikenal: {engine}")
+    if not os.path.exists(base_dir):
+        raise FileNotFoundError(f"Folder '{base_dir}' tidak ditemukan")
+    if engine in ("auto", "compiled") and has_bundle(base_dir):
+        model, scaler, label_encoder, feature_names, metadata = load_bundle(base_dir)
+    else:
+        model, scaler, label_encoder, feature_names, metadata = (
+            joblib.load(os.path.join(base_dir, MODEL_FILES[key]))
+            for key in ["model", "scaler", "label_encoder", "feature_names", "metadata"]
+        )
+        if engine == "compiled":
+            model = compile_forest(model)
+
+    if early_exit is not None:
+        model = compile_forest(model)
+        if not isinstance(model, CompiledForest):
+            raise ValueError(
+                f"Early exit hanya tersedia untuk Random Forest, bukan {type(model).__name__}"
+            )
+        model.early_exit = early_exit
+        return model, scaler, label_encoder, feature_names, {
+            **metadata, "confidence_truncated": True,
+        }
+
+    calibration = load_calibration(base_dir)
+    if calibration is not None:
+        metadata = {**metadata, "calibration": calibration}
+    return model, scaler, label_encoder, feature_names, metadata
+
+
+def variant_dir(base_dir="deployment_files", variant="teacher"):
+    """Folder komponen untuk varian model; murid disimpan di sub-folder student"""
+    if variant not in MODEL_VARIANTS:
+        raise ValueError(f"Varian model tidak dikenal: {variant}")
+    return base_dir if variant == "teacher" else os.path.join(base_dir, STUDENT_DIR)
+
+
+def confidence_truncated(components):
+    """True jika confidence berasal dari mode anytime (sebagian pohon saja)"""
+    return bool(components[4].get("confidence_truncated", False))
+
+
+def calibrated_confidence(probabilities, components):
+    """Confidence top-1 terkalibrasi untuk matriks probabilitas; None jika tanpa kalibrasi"""
+    calibration = components[4].get("calibration")
+    if calibration is None:
+        return None
+    return calibrate(probabilities.max(axis=1), calibration)
+
+
+def get_health_score(input_data, bmi):
+    """
+    Menghitung skor kesehatan berdasarkan BMI dan gaya hidup
+    - Nilai dikurangi jika memiliki kebiasaan tidak sehat
+    - Rentang skor: 0–100
+    """
+    score = 100
+
+    # BMI impact
+    if bmi < 18.5 or bmi > 30:
+        score -= 30
+    elif bmi > 25:
+        score -= 15
+
+    # Lifestyle factors
+    if input_data['FAF'] < 1:
+        score -= 15
+    if input_data['FCVC'] < 2:
+        score -= 10
+    if input_data['CH2O'] < 2:
+        score -= 10
+    if input_data['FAVC'] == 'yes':
+        score -= 10
+    if input_data['SMOKE'] == 'yes':
+        score -= 15
+    if input_data['TUE'] > 1.5:
+        score -= 5
+
+    return max(0, score)
+
+
+def get_health_scores(frame, bmi):
+    """Versi vektor dari get_health_score untuk satu DataFrame sekaligus"""
+    def numeric(col):
+        return pd.to_numeric(frame[col], errors="coerce").to_numpy(dtype=np.float64)
+
+    score = np.full(len(frame), 100, dtype=np.int64)
+    score -= np.where((bmi < 18.5) | (bmi > 30), 30, np.where(bmi > 25, 15, 0))
+    score -= np.where(numeric("FAF") < 1, 15, 0)
+    score -= np.where(numeric("FCVC") < 2, 10, 0)
+    score -= np.where(numeric("CH2O") < 2, 10, 0)
+    score -= np.where(frame["FAVC"].to_numpy(dtype=object, na_value=None) == "yes", 10, 0)
+    score -= np.where(frame["SMOKE"].to_numpy(dtype=object, na_value=None) == "yes", 15, 0)
+    score -= np.where(numeric("TUE") > 1.5, 5, 0)
+    return np.maximum(score, 0)
+
+
+@dataclass
+class PredictionResult:
+    """Hasil prediksi satu responden"""
+
+    predicted_class: str
+    prediction: int
+    probabilities: np.ndarray
+    bmi: float
+    health_score: int
+    calibrated_confidence: float = None
+    confidence_truncated: bool = False
+
+    @property
+    def confidence(self):
+        return float(self.probabilities.max())
+
+    def to_dict(self, class_names):
+        """Bentuk JSON-friendly untuk API"""
+        result = {
+            "predicted_class": self.predicted_class,
+            "confidence": self.confidence,
+            "probabilities": dict(zip(class_names, map(float, self.probabilities))),
+            "bmi": float(self.bmi),
+            "health_score": int(self.health_score),
+        }
+        if self.calibrated_confidence is not None:
+            result["calibrated_confidence"] = float(self.calibrated_confidence)
+        if self.confidence_truncated:
+            result["confidence_truncated"] = True
+        return result
+
+
+def predict_probabilities(data, components, cache=None):
+    """
+    Preprocessing dan predict_proba untuk list dict atau DataFrame.
+    Jika cache diberikan, baris yang sudah pernah diprediksi maupun duplikat
+    di dalam batch yang sama tidak dikirim ke model.
+    """
+    model, scaler, _, feature_names, _ = components
+    encoder = build_encoder(scaler, feature_names)
+    if cache is None:
+        with timer("preprocess"):
+            X = encoder.transform(data)
+        with timer("predict_proba"):
+            return model.predict_proba(X)
+
+    # Kelompokkan baris dengan kunci yang sama
+    slots, first_rows = {}, []
+    inverse = np.empty(len(data), dtype=np.intp)
+    for i, key in enumerate(make_cache_keys(data)):
+        slot = slots.get(key)
+        if slot is None:
+            slot = slots[key] = len(first_rows)
+            first_rows.append(i)
+        inverse[i] = slot
+    unique_keys = list(slots)
+    cache.record_hits(len(inverse) - len(unique_keys))
+
+    table = np.empty((len(unique_keys), len(model.classes_)), dtype=np.float64)
+    missing = []
+    for slot, key in enumerate(unique_keys):
+        cached = cache.get(key)
+        if cached is None:
+            missing.append(slot)
+        else:
+            table[slot] = cached
+
+    if missing:
+        rows = [first_rows[slot] for slot in missing]
+        if isinstance(data, pd.DataFrame):
+            subset = data.iloc[rows]
+        else:
+            subset = [data[i] for i in rows]
+        with timer("preprocess"):
+            X = encoder.transform(subset)
+        with timer("predict_proba"):
+            fresh = model.predict_proba(X)
+        table[missing] = fresh
+        for slot, probabilities in zip(missing, fresh):
+            cache.put(unique_keys[slot], probabilities.copy())
+    return table[inverse]
+
+
+def infer(data, components, cache=None):
+    """
+    Menjalankan forest satu kali untuk list dict atau DataFrame:
+    - Kelas diambil dari argmax probabilitas (tanpa model.predict terpisah)
+    - Mengembalikan (probabilities, encoded_labels, class_labels)
+    """
+    model, _, label_encoder, _, _ = components
+    probabilities = predict_probabilities(data, components, cache)
+    with timer("decode"):
+        encoded = model.classes_[probabilities.argmax(axis=1)]
+        labels = label_encoder.inverse_transform(encoded)
+    return probabilities, encoded, labels
+
+
+def predict_batch(rows, components, cache=None):
+    """Memprediksi list dict input dan mengembalikan list PredictionResult"""
+    probabilities, encoded, labels = infer(rows, components, cache)
+    calibrated = calibrated_confidence(probabilities, components)
+    truncated = confidence_truncated(components)
+    results = []
+    for i, (row, proba, code, label) in enumerate(zip(rows, probabilities, encoded, labels)):
+        bmi = calculate_bmi(row["Weight"], row["Height"])
+        results.append(PredictionResult(
+            predicted_class=str(label),
+            prediction=int(code),
+            probabilities=proba,
+            bmi=bmi,
+            health_score=get_health_score(row, bmi),
+            calibrated_confidence=None if calibrated is None else float(calibrated[i]),
+            confidence_truncated=truncated,
+        ))
+    return results
+
+
+def predict(input_data, components, cache=None):
+    """Memprediksi satu dict input dan mengembalikan PredictionResult"""
+    return predict_batch([input_data], components, cache)[0]
+
+
+def score_frame(frame, components, cache=None):
+    """
+    Memprediksi satu DataFrame berisi 16 kolom prediktor:
+    - Preprocessing vektor, satu panggilan predict_proba
+    - Menambahkan kolom predicted_class, confidence, BMI, dan health_score
+    - calibrated_confidence ikut ditambahkan jika model memiliki kalibrasi
+    - confidence_truncated (True) ditambahkan jika early exit aktif
+    """
+    missing = [col for col in RAW_COLUMNS if col not in frame.columns]
+    if missing:
+        raise ValueError(f"Kolom wajib tidak ditemukan: {', '.join(missing)}")
+
+    probabilities, _, labels = infer(frame, components, cache)
+
+    height = pd.to_numeric(frame["Height"], errors="coerce").to_numpy(dtype=np.float64)
+    weight = pd.to_numeric(frame["Weight"], errors="coerce").to_numpy(dtype=np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        bmi = np.where(height > 0, weight / height**2, 0.0)
+
+    result = frame.copy()
+    result["predicted_class"] = labels
+    result["confidence"] = probabilities.max(axis=1)
+    calibrated = calibrated_confidence(probabilities, components)
+    if calibrated is not None:
+        result["calibrated_confidence"] = calibrated
+    if confidence_truncated(components):
+        result["confidence_truncated"] = True
+    result["BMI"] = bmi
+    result["health_score"] = get_health_scores(frame, bmi)
+    return result
+
+
+def score_csv(source, destination, components, chunksize=DEFAULT_CHUNKSIZE, cache=None):
+    """
+    Memprediksi file CSV secara bertahap (per chunk) agar memori tetap konstan.
+    source/destination boleh berupa path atau file object.
+    Cache (opsional) membuat baris duplikat antar chunk tidak diprediksi ulang.
+    Mengembalikan jumlah baris yang diproses.
+    """
+    own_file = isinstance(destination, (str, os.PathLike))
+    handle = open(destination, "w", newline="") if own_file else destination
+    total_rows = 0
+    try:
+        for chunk in pd.read_csv(source, chunksize=chunksize):
+            scored = score_frame(chunk, components, cache)
+            scored.to_csv(handle, header=total_rows == 0, index=False)
+            total_rows += len(scored)
+    finally:
+        if own_file:
+            handle.close()
+    return total_rows
+
+
+# --- Input/Output Kolumnar (Parquet/Arrow) ---
+def file_format(path):
+    """Menentukan format file dari ekstensinya (csv, parquet, atau arrow)"""
+    ext = os.path.splitext(str(path))[1].lower()
+    if ext not in FILE_FORMATS:
+        raise ValueError(f"Format file tidak didukung: {ext or path}")
+    return FILE_FORMATS[ext]
+
+
+def iter_record_batches(source, batch_size=DEFAULT_CHUNKSIZE):
+    """
+    Membaca Parquet/Arrow per record batch tanpa memuat seluruh tabel:
+    - Parquet: kolom kategori langsung dibaca sebagai dictionary
+    - Arrow IPC: format file maupun stream
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    if file_format(source) == "parquet":
+        names = pq.ParquetFile(source).schema_arrow.names
+        parquet_file = pq.ParquetFile(
+            source, read_dictionary=[col for col in DICTIONARY_COLUMNS if col in names]
+        )
+        yield from parquet_file.iter_batches(batch_size=batch_size)
+        return
+
+    with pa.memory_map(str(source)) as stream:
+        try:
+            reader = pa.ipc.open_file(stream)
+            batches = (reader.get_batch(i) for i in range(reader.num_record_batches))
+        except pa.ArrowInvalid:
+            stream.seek(0)
+            batches = pa.ipc.open_stream(stream)
+        yield from batches
+
+
+def record_batch_to_frame(batch):
+    """Record batch -> DataFrame; kolom kategori string di-dictionary-encode dulu"""
+    import pyarrow as pa
+
+    columns = []
+    for name, column in zip(batch.schema.names, batch.columns):
+        if name in DICTIONARY_COLUMNS and not pa.types.is_dictionary(column.type):
+            column = column.dictionary_encode()
+        columns.append(column)
+    return pa.RecordBatch.from_arrays(columns, names=batch.schema.names).to_pandas()
+
+
+def score_columnar(source, destination, components, batch_size=DEFAULT_CHUNKSIZE, cache=None):
+    """
+    Seperti score_csv untuk file Parquet/Arrow:
+    - Dibaca dan diprediksi per record batch (memori konstan)
+    - Kolom kategori tetap bertipe dictionary dan dipetakan ke slot one-hot lewat kodenya
+    - Output Parquet, atau Arrow IPC stream (mendukung dictionary berbeda per batch)
+    Mengembalikan jumlah baris yang diproses.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    output_format = file_format(destination)
+    if output_format == "csv":
+        raise ValueError("Gunakan score_csv untuk output CSV")
+    writer, schema, sink, total_rows = None, None, None, 0
+    try:
+        for batch in iter_record_batches(source, batch_size):
+            scored = score_frame(record_batch_to_frame(batch), components, cache)
+            scored["predicted_class"] = scored["predicted_class"].astype("category")
+            table = pa.Table.from_pandas(scored, preserve_index=False)
+            if writer is None:
+                schema = table.schema
+                if output_format == "parquet":
+                    writer = pq.ParquetWriter(destination, schema)
+                else:
+                    sink = pa.OSFile(str(destination), "wb")
+                    writer = pa.ipc.new_stream(sink, schema)
+            writer.write_table(table.cast(schema))
+            total_rows += len(scored)
+    finally:
+        if writer is not None:
+            writer.close()
+        if sink is not None:
+            sink.close()
+    return total_rows
+
+
+def score_file(source, destination, components, chunksize=DEFAULT_CHUNKSIZE, cache=None):
+    """Memilih jalur CSV atau kolumnar berdasarkan ekstensi file input"""
+    if file_format(source) == "csv" and file_format(destination) == "csv":
+        return score_csv(source, destination, components, chunksize, cache)
+    if file_format(source) == "csv":
+        raise ValueError("Input CSV hanya dapat ditulis ke output CSV")
+    return score_columnar(source, destination, components, chunksize, cache)
+
+
+# --- Scoring Paralel (Process Pool) ---
+# State proses worker; pada start method "fork" komponen diwarisi dari proses induk
+_WORKER = {}
+
+
+def _init_worker(model_dir, engine, cache_size):
+    if "components" not in _WORKER:
+        _WORKER["components"] = load_components(model_dir, engine)
+    _WORKER["cache"] = PredictionCache(cache_size) if cache_size > 0 else None
+
+
+def _score_chunk(chunk):
+    """
+    Dijalankan di worker: hanya kolom hasil yang dikirim balik ke proses induk,
+    yaitu semua kolom yang ditambahkan score_frame (termasuk calibrated_confidence)
+    """
+    scored = score_frame(chunk, _WORKER["components"], _WORKER["cache"])
+    return scored.drop(columns=chunk.columns)
+
+
+def score_csv_parallel(source, destination, model_dir="deployment_files", engine="auto",
+                       chunksize=DEFAULT_CHUNKSIZE, workers=None,
+                       cache_size=DEFAULT_CACHE_SIZE):
+    """
+    Seperti score_csv, tetapi chunk diproses paralel oleh process pool:
+    - Model dimuat sekali di proses induk lalu worker di-fork, sehingga array forest
+      (mmap read-only dari bundle) dan model sklearn dibagi tanpa unpickle per worker
+    - Tanpa fork (Windows/macOS spawn), setiap worker memuat komponen sendiri
+    - Hasil ditulis sesuai urutan input; maksimal 2 chunk per worker yang sedang diproses
+    - Cache prediksi berlaku per worker
+    Mengembalikan jumlah baris yang diproses.
+    """
+    workers = workers or os.cpu_count() or 1
+    context = None
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        components = load_components(model_dir, engine)
+        if hasattr(components[0], "load_fallback"):
+            components[0].load_fallback()
+        _WORKER["components"] = components
+
+    own_file = isinstance(destination, (str, os.PathLike))
+    handle = open(destination, "w", newline="") if own_file else destination
+    total_rows = 0
+
+    def write_oldest(pending):
+        nonlocal total_rows
+        chunk, future = pending.popleft()
+        scored = pd.concat([chunk, future.result().set_axis(chunk.index)], axis=1)
+        scored.to_csv(handle, header=total_rows == 0, index=False)
+        total_rows += len(scored)
+
+    try:
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                                 initargs=(model_dir, engine, cache_size)) as pool:
+            pending = deque()
+            for chunk in pd.read_csv(source, chunksize=chunksize):
+                pending.append((chunk, pool.submit(_score_chunk, chunk)))
+                if len(pending) >= 2 * workers:
+                    write_oldest(pending)
+            while pending:
+                write_oldest(pending)
+    finally:
+        _WORKER.clear()
+        if own_file:
+            handle.close()
+    return total_rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Prediksi tingkat obesitas secara batch dari file CSV, Parquet, atau Arrow"
+    )
+    parser.add_argument("input", help="File CSV/Parquet/Arrow dengan 16 kolom prediktor")
+    parser.add_argument("-o", "--output", required=True,
+                        help="File hasil prediksi (format mengikuti ekstensi)")
+    parser.add_argument("--model-dir", default="deployment_files",
+                        help="Folder komponen model (default: deployment_files)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help="Jumlah baris per chunk")
+    parser.add_argument("--engine", choices=ENGINES, default="auto",
+                        help="Engine inferensi forest (default: auto)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE,
+                        help="Jumlah input unik yang di-cache (0 = nonaktif)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Jumlah proses worker (0 = semua core, 1 = tanpa process pool)")
+    args = parser.parse_args(argv)
+
+    cache = None
+    start = time.perf_counter()
+    try:
+        if args.workers == 1:
+            components = load_components(args.model_dir, args.engine)
+            cache = PredictionCache(args.cache_size) if args.cache_size > 0 else None
+            total_rows = score_file(args.input, args.output, components, args.chunksize, cache)
+        elif file_format(args.input) != "csv" or file_format(args.output) != "csv":
+            raise ValueError("Scoring dengan --workers saat ini hanya mendukung file CSV")
+        else:
+            total_rows = score_csv_parallel(
+                args.input, args.output, args.model_dir, args.engine, args.chunksize,
+                args.workers or None, args.cache_size,
+            )
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    print(f"✅ {total_rows:,} baris diprediksi dalam {elapsed:.2f} detik")
+    if cache is not None:
+        stats = cache.stats()
+        print(f"🗃️ Cache: {stats['hits']:,} hit, {stats['misses']:,} miss")
+    print(f"📁 Hasil tersimpan: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
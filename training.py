@@ -0,0 +1,405 @@
+import argparse
+import os
+import resource
+import time
+import tracemalloc
+import warnings
+from contextlib import contextmanager
+
+import joblib
+import pandas as pd
+from imblearn.over_sampling import SMOTE
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score
+from sklearn.base import clone
+from sklearn.model_selection import cross_val_score, train_test_split
+from sklearn.naive_bayes import GaussianNB
+from sklearn.neighbors import KNeighborsClassifier
+from sklearn.preprocessing import LabelEncoder, StandardScaler
+from sklearn.svm import SVC
+from sklearn.tree import DecisionTreeClassifier
+
+from calibration import (
+    calibration_path, calibration_report, crossfit_calibrated, fit_calibration,
+    save_calibration,
+)
+from fold_cache import FoldCache
+from model_bundle import has_bundle, remove_bundle, save_bundle, supports_bundle
+from neighbors import build_neighbor_index, save_neighbor_index
+from param_search import SEARCH_MODES, SEARCH_STORE, ResultStore, SearchRunner
+from preprocessing import (
+    NUMERICAL_FEATURES, RAW_NUMERICAL_COLUMNS, build_feature_frame, clean_data, load_dataset,
+    transform_frame,
+)
+from scoring import MODEL_FILES
+
+RANDOM_STATE = 42
+TARGET_COLUMN = "NObeyesdad"
+# Porsi baris survei asli yang disisihkan untuk kalibrasi probabilitas
+CALIBRATION_SIZE = 0.5
+# Jawaban survei asli bernilai bulat; baris sintetis (SMOTE) bawaan dataset bernilai pecahan
+SURVEY_COLUMNS = ["Age", "FCVC", "NCP", "CH2O", "FAF", "TUE"]
+SURVEY_FLAG = "_survei"
+
+# Grid hyperparameter sesuai notebook Final (untuk 3 model teratas)
+PARAM_GRIDS = {
+    "Random Forest": {
+        "n_estimators": [100, 200, 300],
+        "max_depth": [10, 20, None],
+        "min_samples_split": [2, 5, 10],
+        "min_samples_leaf": [1, 2, 4],
+    },
+    "Gradient Boosting": {
+        "n_estimators": [100, 200, 300],
+        "learning_rate": [0.05, 0.1, 0.2],
+        "max_depth": [3, 5, 7],
+        "min_samples_split": [2, 5, 10],
+    },
+    "SVM": {
+        "C": [0.1, 1, 10, 100],
+        "kernel": ["rbf", "poly"],
+        "gamma": ["scale", "auto", 0.001, 0.01],
+    },
+    "Logistic Regression": {
+        "C": [0.01, 0.1, 1, 10, 100],
+        "penalty": ["l1", "l2"],
+        "solver": ["liblinear", "saga"],
+    },
+    "K-Nearest Neighbors": {
+        "n_neighbors": [3, 5, 7, 9, 11],
+        "weights": ["uniform", "distance"],
+        "metric": ["euclidean", "manhattan", "minkowski"],
+    },
+}
+
+
+def build_models(n_jobs=None):
+    """Model kandidat sesuai notebook Final; model yang mendukung n_jobs ikut diparalelkan"""
+    return {
+        "Random Forest": RandomForestClassifier(
+            random_state=RANDOM_STATE, n_estimators=100, n_jobs=n_jobs
+        ),
+        "Gradient Boosting": GradientBoostingClassifier(random_state=RANDOM_STATE, n_estimators=100),
+        "SVM": SVC(random_state=RANDOM_STATE, probability=True),
+        "Logistic Regression": LogisticRegression(random_state=RANDOM_STATE, max_iter=1000),
+        "K-Nearest Neighbors": KNeighborsClassifier(n_neighbors=5, n_jobs=n_jobs),
+        "Decision Tree": DecisionTreeClassifier(random_state=RANDOM_STATE),
+        "Naive Bayes": GaussianNB(),
+    }
+
+
+# --- Pengukuran Tahap ---
+@contextmanager
+def stage(name, report):
+    """
+    Mencatat durasi dan puncak memori satu tahap pipeline:
+    - seconds: waktu wall-clock
+    - peak_mb: puncak alokasi Python/NumPy selama tahap (tracemalloc)
+    - max_rss_mb: RSS maksimum proses sejauh ini
+    """
+    print(f"⏳ {name}...")
+    tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        report.append({
+            "stage": name, "seconds": elapsed,
+            "peak_mb": peak / 1024**2, "max_rss_mb": max_rss,
+        })
+        print(f"✅ {name}: {elapsed:.2f} s, puncak {peak / 1024**2:.1f} MB")
+
+
+# --- Tahapan Pipeline ---
+def cap_outliers(df):
+    """Winsorization persentil 5–95 untuk kolom numerik yang memiliki outlier IQR"""
+    df = df.copy()
+    for col in RAW_NUMERICAL_COLUMNS:
+        q1, q3 = df[col].quantile([0.25, 0.75])
+        iqr = q3 - q1
+        if ((df[col] < q1 - 1.5 * iqr) | (df[col] > q3 + 1.5 * iqr)).any():
+            df[col] = df[col].clip(df[col].quantile(0.05), df[col].quantile(0.95))
+    return df
+
+
+def split_and_scale(X, y):
+    """Split stratified 80/20, lalu StandardScaler di-fit hanya pada data latih"""
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=RANDOM_STATE, stratify=y
+    )
+    scaler = StandardScaler()
+    X_train, X_test = X_train.copy(), X_test.copy()
+    X_train[NUMERICAL_FEATURES] = scaler.fit_transform(X_train[NUMERICAL_FEATURES])
+    X_test[NUMERICAL_FEATURES] = scaler.transform(X_test[NUMERICAL_FEATURES])
+    return X_train, X_test, y_train, y_test, scaler
+
+
+def evaluate(model, X_test, y_test):
+    """Metrik weighted seperti pada notebook"""
+    y_pred = model.predict(X_test)
+    return {
+        "akurasi": accuracy_score(y_test, y_pred),
+        "presisi": precision_score(y_test, y_pred, average="weighted"),
+        "recall": recall_score(y_test, y_pred, average="weighted"),
+        "f1_score": f1_score(y_test, y_pred, average="weighted"),
+    }
+
+
+def train_candidates(models, X_train, X_test, y_train, y_test, n_jobs=None, folds=None):
+    """
+    Melatih semua model kandidat dan mengembalikan hasil terurut menurut akurasi.
+    Dengan folds (FoldCache), CV memakai matriks per fold yang sudah di-SMOTE dan di-scale.
+    """
+    results = []
+    for name, model in models.items():
+        model.fit(X_train, y_train)
+        scores = evaluate(model, X_test, y_test)
+        if folds is not None:
+            cv_scores = folds.cross_validate(model, n_jobs)
+        else:
+            cv_scores = cross_val_score(model, X_train, y_train, cv=5, scoring="accuracy",
+                                        n_jobs=n_jobs)
+        results.append({"model": name, **scores, "cv_mean": cv_scores.mean()})
+        print(f"   {name:22s} akurasi {scores['akurasi']:.4f}, CV {cv_scores.mean():.4f}")
+    return sorted(results, key=lambda row: row["akurasi"], reverse=True)
+
+
+def tune_models(models, names, X_train, X_test, y_train, y_test, n_iter=20, n_jobs=None,
+                search="random", store_path=None, folds=None):
+    """
+    Pencarian hyperparameter (param_search.SearchRunner) untuk model yang memiliki grid:
+    - search="random": kandidat dan fold sama dengan RandomizedSearchCV(cv=5)
+    - search="halving" atau "grid": lihat SearchRunner.search
+    - store_path: file skor trial; trial yang sudah selesai tidak dihitung ulang
+    - folds: FoldCache untuk CV (lihat train_candidates)
+    Model terbaik di-fit ulang pada seluruh data latih. Model tanpa grid dilewati.
+    """
+    tuned = {}
+    workers = os.cpu_count() if n_jobs is not None and n_jobs < 0 else n_jobs or 1
+    store = ResultStore(store_path)
+    with SearchRunner(models, X_train, y_train, store, workers=workers, folds=folds) as runner:
+        for name in names:
+            if name not in PARAM_GRIDS:
+                print(f"   Melewatkan {name} - tidak ada grid parameter")
+                continue
+            result = runner.search(name, PARAM_GRIDS[name], search, n_iter)
+            best_model = clone(models[name]).set_params(**result["best_params"])
+            best_model.fit(X_train, y_train)
+            scores = evaluate(best_model, X_test, y_test)
+            tuned[name] = {"model": best_model, "best_params": result["best_params"], **scores}
+            print(f"   {name:22s} akurasi {scores['akurasi']:.4f}, parameter "
+                  f"{result['best_params']} ({result['trials_computed']} trial dihitung, "
+                  f"{result['trials_reused']} dipakai ulang)")
+    return tuned
+
+
+def save_artifacts(output_dir, model, scaler, label_encoder, feature_names, metadata):
+    """Menyimpan komponen dengan nama file yang dimuat aplikasi (MODEL_FILES)"""
+    os.makedirs(output_dir, exist_ok=True)
+    components = {
+        "model": model, "scaler": scaler, "label_encoder": label_encoder,
+        "feature_names": list(feature_names), "metadata": metadata,
+    }
+    for key, value in components.items():
+        joblib.dump(value, os.path.join(output_dir, MODEL_FILES[key]))
+    # Bundle lama akan dimuat lebih dulu oleh engine "auto", jadi ikut diperbarui;
+    # model selain random forest tidak punya bundle, sehingga bundle lama dihapus
+    if has_bundle(output_dir):
+        if supports_bundle(model):
+            save_bundle((model, scaler, label_encoder, list(feature_names), metadata), output_dir)
+        else:
+            remove_bundle(output_dir)
+
+
+def survey_rows(df):
+    """
+    Penanda baris survei asli di ObesityDataSet.csv (sekitar 23% data):
+    - Semua kolom SURVEY_COLUMNS bernilai bulat; nilai kosong tidak dianggap pecahan
+    - Baris sintetis bawaan dataset hampir selalu memiliki nilai pecahan
+    """
+    values = df[SURVEY_COLUMNS].apply(pd.to_numeric, errors="coerce")
+    return (values.isna() | (values % 1 == 0)).all(axis=1)
+
+
+def split_calibration_holdout(df, calibration_size, seed=RANDOM_STATE):
+    """
+    Menyisihkan holdout kalibrasi hanya dari baris survei asli (kolom SURVEY_FLAG);
+    stratified jika setiap kelas memiliki minimal dua baris survei.
+    Mengembalikan (df tanpa holdout, holdout).
+    """
+    survey = df[df[SURVEY_FLAG]]
+    counts = survey[TARGET_COLUMN].value_counts()
+    stratify = survey[TARGET_COLUMN] if counts.min() >= 2 else None
+    _, holdout = train_test_split(survey, test_size=calibration_size, random_state=seed,
+                                  stratify=stratify)
+    return df.drop(index=holdout.index), holdout
+
+
+def fit_holdout_calibration(model, scaler, label_encoder, feature_names, holdout):
+    """
+    Kalibrasi confidence model final pada baris survei asli yang tidak ikut SMOTE
+    maupun training (baris sintetis dataset membuat confidence terlalu tinggi).
+    ECE/Brier di laporan dihitung out-of-fold (cross-fitting) di dalam holdout.
+    """
+    X = transform_frame(holdout, scaler, feature_names)
+    probabilities = model.predict_proba(X)
+    predicted = model.classes_[probabilities.argmax(axis=1)]
+    correct = predicted == label_encoder.transform(holdout[TARGET_COLUMN])
+    confidence = probabilities.max(axis=1)
+    calibration = fit_calibration(confidence, correct)
+    calibration["report"] = calibration_report(
+        confidence, correct, crossfit_calibrated(confidence, correct)
+    )
+    return calibration
+
+
+def prepare_training_data(data_path, report, calibration_size=CALIBRATION_SIZE):
+    """
+    Tahap data pipeline (durasi masing-masing dicatat di report):
+    - Pembersihan, winsorization, dan holdout kalibrasi dari baris survei asli
+    - Rekayasa fitur, SMOTE, split stratified, dan scaling
+    Mengembalikan (X_train, X_test, y_train, y_test, scaler, label_encoder, holdout, cv_rows);
+    cv_rows = (fitur sebelum scaling, label) baris asli di data latih, untuk FoldCache.
+    """
+    with stage("Memuat dan membersihkan data", report):
+        raw = load_dataset(data_path)
+        # Penanda dihitung sebelum nilai kosong diisi median (median bernilai pecahan)
+        df = cap_outliers(clean_data(raw.assign(**{SURVEY_FLAG: survey_rows(raw)})))
+        holdout = None
+        if calibration_size:
+            df, holdout = split_calibration_holdout(df, calibration_size)
+        df = df.drop(columns=SURVEY_FLAG)
+
+    with stage("Rekayasa fitur", report):
+        X = build_feature_frame(df)
+        label_encoder = LabelEncoder()
+        y = label_encoder.fit_transform(df[TARGET_COLUMN])
+
+    with stage("SMOTE", report):
+        X_real, y_real = X.reset_index(drop=True), y
+        X, y = SMOTE(random_state=RANDOM_STATE).fit_resample(X_real, y_real)
+
+    with stage("Split dan scaling", report):
+        X_train, X_test, y_train, y_test, scaler = split_and_scale(X, y)
+    # SMOTE menaruh baris asli di depan, baris sintetis di belakang
+    real = X_train.index[X_train.index < len(X_real)]
+    cv_rows = (X_real.loc[real], y_real[real])
+    return X_train, X_test, y_train, y_test, scaler, label_encoder, holdout, cv_rows
+
+
+def run_pipeline(data_path, output_dir, n_jobs=None, n_iter=20, top_k=3,
+                 calibration_size=CALIBRATION_SIZE, search="random", search_store=None,
+                 fold_cache_dir=None):
+    """Menjalankan seluruh pipeline training dan mengembalikan (metadata, laporan tahap)"""
+    report = []
+    X_train, X_test, y_train, y_test, scaler, label_encoder, holdout, cv_rows = (
+        prepare_training_data(data_path, report, calibration_size)
+    )
+    folds = None
+    if fold_cache_dir:
+        with stage("Cache fold CV (SMOTE dan scaling per fold)", report):
+            folds = FoldCache.build(fold_cache_dir, *cv_rows)
+
+    models = build_models(n_jobs)
+    with stage("Training model kandidat", report):
+        results = train_candidates(models, X_train, X_test, y_train, y_test, n_jobs, folds)
+
+    with stage("Hyperparameter tuning", report):
+        top_models = [row["model"] for row in results[:top_k]]
+        tuned = tune_models(models, top_models, X_train, X_test, y_train, y_test,
+                            n_iter, n_jobs, search, search_store, folds)
+        if tuned:
+            best_name = max(tuned, key=lambda name: tuned[name]["akurasi"])
+            best = tuned[best_name]
+        else:
+            best_name = results[0]["model"]
+            best = {"model": models[best_name], "best_params": {}, **results[0]}
+
+    final_model = best["model"]
+    calibration = None
+    if holdout is not None:
+        with stage("Kalibrasi probabilitas", report):
+            calibration = fit_holdout_calibration(
+                final_model, scaler, label_encoder, X_train.columns, holdout
+            )
+
+    with stage("Menyimpan artefak", report):
+        # n_jobs hanya untuk training; saat serving satu baris, thread pool joblib per
+        # predict_proba lebih mahal daripada prediksinya dan bertabrakan dengan worker batch
+        if "n_jobs" in final_model.get_params():
+            final_model.set_params(n_jobs=None)
+        metadata = {
+            "nama_model": best_name,
+            "tipe_model": type(final_model).__name__,
+            "akurasi": best["akurasi"],
+            "f1_score": best["f1_score"],
+            "presisi": best["presisi"],
+            "recall": best["recall"],
+            "parameter_terbaik": best["best_params"],
+            "jumlah_fitur": X_train.shape[1],
+            "kelas_target": list(label_encoder.classes_),
+            "fitur_numerik": NUMERICAL_FEATURES,
+        }
+        if calibration is not None:
+            metadata["kalibrasi"] = {"sumber": "baris survei asli",
+                                     "jumlah_baris": calibration["n_samples"],
+                                     **calibration["report"]}
+        save_artifacts(output_dir, final_model, scaler, label_encoder, X_train.columns, metadata)
+        if calibration is not None:
+            save_calibration(calibration, output_dir)
+        elif os.path.exists(calibration_path(output_dir)):
+            # Kalibrasi lama milik model sebelumnya tidak berlaku lagi
+            os.remove(calibration_path(output_dir))
+        # Index responden mirip bergantung pada scaler, jadi selalu dibangun ulang
+        index = build_neighbor_index(scaler, X_train.columns, data_path)
+        save_neighbor_index(index, output_dir)
+
+    return metadata, report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Pipeline training offline (setara notebook Final) untuk artefak aplikasi"
+    )
+    parser.add_argument("--data", default="ObesityDataSet.csv")
+    parser.add_argument("--output-dir", default="deployment_files",
+                        help="Folder tujuan artefak (default: deployment_files)")
+    parser.add_argument("--n-jobs", type=int, default=-1,
+                        help="Jumlah proses paralel untuk training dan CV (default: semua core)")
+    parser.add_argument("--n-iter", type=int, default=20,
+                        help="Jumlah kombinasi RandomizedSearchCV per model")
+    parser.add_argument("--top-k", type=int, default=3,
+                        help="Jumlah model teratas yang di-tuning")
+    parser.add_argument("--calibration-size", type=float, default=CALIBRATION_SIZE,
+                        help="Porsi baris survei asli untuk kalibrasi (0 = tanpa kalibrasi, "
+                             "sama persis dengan notebook)")
+    parser.add_argument("--search", choices=SEARCH_MODES, default="random",
+                        help="Strategi tuning: random (seperti notebook), grid, atau halving")
+    parser.add_argument("--search-store", default=None,
+                        help=f"File skor trial untuk resume tuning (misalnya {SEARCH_STORE})")
+    parser.add_argument("--fold-cache", default=None, metavar="DIR",
+                        help="CV tanpa kebocoran SMOTE: matriks per fold di-cache di folder ini")
+    args = parser.parse_args(argv)
+
+    warnings.filterwarnings("ignore")
+    metadata, report = run_pipeline(args.data, args.output_dir, args.n_jobs,
+                                    args.n_iter, args.top_k, args.calibration_size,
+                                    args.search, args.search_store, args.fold_cache)
+
+    print(f"\n🏆 Model final: {metadata['nama_model']} (akurasi {metadata['akurasi']:.4f})")
+    if "kalibrasi" in metadata:
+        calibration = metadata["kalibrasi"]
+        print(f"🎯 Kalibrasi ({calibration['jumlah_baris']} baris survei asli): ECE "
+              f"{calibration['ece_mentah']:.4f} -> {calibration['ece_terkalibrasi']:.4f}")
+    print(pd.DataFrame(report).round(2).to_string(index=False))
+    print(f"📁 Artefak tersimpan di: {args.output_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+
+from metrics import timer
+from preprocessing import build_encoder
+
+# Rentang sweep mengikuti slider/number_input pada form prediksi: (min, max, langkah)
+SWEEP_RANGES = {
+    "FAF": (0.0, 3.0, 0.1),
+    "FCVC": (1.0, 3.0, 0.1),
+    "CH2O": (1.0, 3.0, 0.1),
+    "TUE": (0.0, 2.0, 0.1),
+    "NCP": (1.0, 4.0, 0.1),
+    "Weight": (30.0, 200.0, 0.5),
+}
+SWEEP_LABELS = {
+    "FAF": "Frekuensi olahraga/minggu",
+    "FCVC": "Konsumsi sayuran (1-3)",
+    "CH2O": "Konsumsi air (liter/hari)",
+    "TUE": "Screen time (jam/hari)",
+    "NCP": "Jumlah makan utama/hari",
+    "Weight": "Berat Badan (kg)",
+}
+
+
+def sweep_values(variable):
+    """Nilai-nilai sweep untuk satu variabel (termasuk batas atas)"""
+    low, high, step = SWEEP_RANGES[variable]
+    return np.round(np.arange(low, high + step / 2, step), 4)
+
+
+def build_sweep(input_data, variables=None):
+    """
+    Membangun semua baris perturbasi dalam satu DataFrame:
+    - Setiap baris = input asli dengan satu variabel diganti
+    - Kolom tambahan 'variable' dan 'value' menandai perturbasinya
+    """
+    variables = list(variables or SWEEP_RANGES)
+    values = [sweep_values(variable) for variable in variables]
+    sizes = [len(v) for v in values]
+    frame = pd.DataFrame([input_data] * sum(sizes)).reset_index(drop=True)
+    frame["variable"] = np.repeat(variables, sizes)
+    frame["value"] = np.concatenate(values)
+    for variable in variables:
+        mask = frame["variable"] == variable
+        frame.loc[mask, variable] = frame.loc[mask, "value"]
+    return frame
+
+
+def sensitivity_sweep(input_data, components, variables=None):
+    """
+    Analisis what-if: perubahan probabilitas kelas ketika satu variabel gaya hidup
+    digeser sepanjang rentang slider-nya.
+    - Semua baris perturbasi di-encode menjadi satu matriks
+    - Diprediksi dengan satu panggilan predict_proba
+    Mengembalikan DataFrame kolom variable, value, predicted_class, dan satu kolom
+    probabilitas per kelas.
+    """
+    model, scaler, label_encoder, feature_names, _ = components
+    class_names = [str(c) for c in label_encoder.inverse_transform(model.classes_)]
+
+    frame = build_sweep(input_data, variables)
+    with timer("what_if"):
+        X = build_encoder(scaler, feature_names).transform(frame)
+        if getattr(model, "early_exit", None) is not None:
+            # Kurva memakai forest penuh; probabilitas mode anytime terpotong per baris
+            probabilities = model.predict_proba(X, anytime=False)
+        else:
+            probabilities = model.predict_proba(X)
+
+    result = pd.DataFrame(probabilities, columns=class_names)
+    result.insert(0, "variable", frame["variable"])
+    result.insert(1, "value", frame["value"])
+    result.insert(2, "predicted_class", np.array(class_names)[probabilities.argmax(axis=1)])
+    return result